@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: desktop_entry parser vs the old configparser path.
+
+Checks the corpus in bench/desktop-corpus against expected.json, and the
+launcher's top search hit over it against search.json, first. Then it times
+both parsers over the corpus (and optionally the real
+application directories).
+
+    bench/bench_desktop_parser.py [--rounds N] [--system]
+"""
+
+import argparse
+import configparser
+import glob
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "desktop-corpus")
+sys.path.insert(0, os.path.join(HERE, "..", "waybar", "scripts"))
+
+from desktop_entry import is_true, parse_exec, read_desktop_entry, unescape  # noqa: E402
+from launcher_entries import parse_desktop_file  # noqa: E402
+from launcher_search import SearchIndex  # noqa: E402
+
+KEYS = ["Name", "Icon", "Exec", "GenericName", "Keywords", "Comment"]
+
+SYSTEM_DIRS = [
+    "/usr/share/applications",
+    os.path.expanduser("~/.local/share/applications"),
+    "/usr/local/share/applications",
+]
+
+
+def parse_configparser(path):
+    """The pre-desktop_entry launcher path, kept here for comparison."""
+    try:
+        cp = configparser.ConfigParser(interpolation=None)
+        cp.read(path, encoding="utf-8")
+        entry = cp["Desktop Entry"]
+        if entry.get("NoDisplay", "false").lower() == "true":
+            return None
+        if entry.get("Hidden", "false").lower() == "true":
+            return None
+        return {key: entry.get(key, "") for key in KEYS}
+    except Exception:
+        return None
+
+
+def parse_streaming(path):
+    entry = read_desktop_entry(path)
+    if entry is None:
+        return None
+    if is_true(entry.get("NoDisplay")) or is_true(entry.get("Hidden")):
+        return None
+    return {key: entry.get(key, "") for key in KEYS}
+
+
+def check_corpus():
+    with open(os.path.join(CORPUS, "expected.json"), "r") as f:
+        expected = json.load(f)
+    failures = 0
+    os.chdir(CORPUS)
+    for fname, want in sorted(expected.items()):
+        entry = read_desktop_entry(fname)
+        if entry is None:
+            got = None
+        else:
+            name = unescape(entry.get("Name", ""))
+            got = {
+                "name": name,
+                "argv": parse_exec(
+                    entry.get("Exec", ""), unescape(entry.get("Icon", "")),
+                    name, fname,
+                ),
+                "hidden": is_true(entry.get("NoDisplay"))
+                or is_true(entry.get("Hidden")),
+            }
+        if got != want:
+            failures += 1
+            print(f"MISMATCH {fname}\n  want {want!r}\n  got  {got!r}")
+    print(f"corpus: {len(expected) - failures}/{len(expected)} files as expected")
+    return failures
+
+
+def corpus_records():
+    """Launcher records for the corpus files that show up in the launcher."""
+    paths = sorted(glob.glob(os.path.join(CORPUS, "*.desktop")))
+    records = (parse_desktop_file(path, os.path.basename(path)) for path in paths)
+    return [record for record in records if record is not None]
+
+
+def check_search():
+    with open(os.path.join(CORPUS, "search.json"), "r") as f:
+        expected = json.load(f)
+    index = SearchIndex(corpus_records())
+    failures = 0
+    for query, want in sorted(expected.items()):
+        hits = index.search(query, limit=3)
+        if not hits or hits[0][1] != want:
+            failures += 1
+            print(f"SEARCH {query!r}\n  want {want}\n  got  {hits!r}")
+    print(f"search: {len(expected) - failures}/{len(expected)} queries as expected")
+    return failures
+
+
+def bench(label, paths, rounds):
+    results = {}
+    for name, parse in (("configparser", parse_configparser),
+                        ("desktop_entry", parse_streaming)):
+        best = float("inf")
+        for _ in range(rounds):
+            t = time.perf_counter()
+            for path in paths:
+                parse(path)
+            best = min(best, time.perf_counter() - t)
+        results[name] = best
+        print(f"{label:>8} {name:>14}: {best * 1000:8.2f} ms "
+              f"({best / max(len(paths), 1) * 1e6:6.1f} us/file, {len(paths)} files)")
+    speedup = results["configparser"] / max(results["desktop_entry"], 1e-9)
+    print(f"{label:>8} {'speedup':>14}: {speedup:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--system", action="store_true",
+                        help="also time the real application directories")
+    args = parser.parse_args()
+
+    failures = check_corpus() + check_search()
+    bench("corpus", sorted(glob.glob(os.path.join(CORPUS, "*.desktop"))),
+          args.rounds)
+    if args.system:
+        paths = []
+        for app_dir in SYSTEM_DIRS:
+            paths.extend(sorted(glob.glob(os.path.join(app_dir, "*.desktop"))))
+        bench("system", paths, args.rounds)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
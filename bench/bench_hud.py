@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""Headless load test for the launcher and clipboard manager.
+
+Builds a throwaway HOME with synthetic application directories and a
+fake cliphist history, then runs each scenario in its own process so
+peak RSS is per scenario:
+
+  launcher-logic   desktop index cold/warm load, search index, query
+                   latency
+  clipboard-logic  first page, full cliphist list, search
+  launcher-gtk     desktop index cold/warm load, first draw, fully
+                   populated, keystroke latency, scroll step latency,
+                   worst stall
+  clipboard-gtk    the same for the clipboard manager, plus a large
+                   binary copy
+
+The logic scenarios only use the GTK-free modules (launcher_entries,
+launcher_search, clipboard_list), so they run on any Linux box with
+Python. GTK scenarios need PyGObject and a display: an existing
+WAYLAND_DISPLAY/DISPLAY is used with --use-display, otherwise a headless
+weston or Xvfb is started if installed, else they are skipped. Nothing
+touches the network.
+
+    bench/bench_hud.py [--apps 5000] [--clips 50000] [--json]
+    bench/bench_hud.py --only clipboard-gtk --cliphist-delay 2   # slow DB
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = os.path.join(HERE, "..", "waybar", "scripts")
+FAKE_CLIPHIST = os.path.join(HERE, "fake-cliphist")
+
+SCENARIOS = ["launcher-logic", "clipboard-logic", "launcher-gtk", "clipboard-gtk"]
+LAUNCHER_QUERIES = ["f", "fi", "fir", "fire", "te", "term", "ed", "xq", "vsc",
+                    "office", "web browser", "zz"]
+CLIPBOARD_QUERIES = ["a", "al", "alp", "alpha", "clip 4", "delta echo", "zzz"]
+GTK_TIMEOUT = 120
+# Scroll steps (half a page each) timed in the GTK scenarios
+SCROLL_STEPS = 200
+
+WORDS = (
+    "terminal editor browser office media player viewer image mail chat "
+    "calendar music video office notes files manager system monitor code "
+    "studio paint draw photo game network remote shell console settings "
+    "archive backup disk sound record camera map weather clock calc"
+).split()
+
+
+# -- synthetic data ----------------------------------------------------------
+
+def make_apps(root, count, seed=1):
+    """count .desktop files across two dirs, ~5% shadowed by the first."""
+    rnd = random.Random(seed)
+    dirs = [os.path.join(root, "share"), os.path.join(root, "local")]
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+    for i in range(count):
+        words = rnd.sample(WORDS, rnd.randint(1, 3))
+        name = " ".join(w.capitalize() for w in words) + f" {i}"
+        lines = [
+            "[Desktop Entry]",
+            "Type=Application",
+            f"Name={name}",
+            f"GenericName={rnd.choice(WORDS).capitalize()} Tool",
+            f"Comment=Synthetic application number {i}",
+            f"Keywords={';'.join(rnd.sample(WORDS, 3))};",
+            f"Exec=/usr/bin/app-{i} --flag %U",
+            f"Icon=app-{i % 97}",
+            "Terminal=false",
+        ]
+        if i % 20 == 0:
+            lines.append("NoDisplay=true")
+        for lang in ("de", "fr", "ru", "ja"):
+            lines.append(f"Name[{lang}]={name} ({lang})")
+        lines += ["", "[Desktop Action new-window]", "Name=New Window",
+                  f"Exec=/usr/bin/app-{i} --new-window"]
+        target = dirs[0] if i % 3 else dirs[1]
+        with open(os.path.join(target, f"app-{i}.desktop"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        if i % 20 == 1:
+            # Same filename lower in precedence: must be ignored
+            with open(os.path.join(dirs[1], f"app-{i}.desktop"), "w") as f:
+                f.write("[Desktop Entry]\nName=Shadowed\nExec=false\n")
+    return dirs
+
+
+def make_history(db, count, binary_every=50, seed=2):
+    """`cliphist list` output, newest (highest id) first."""
+    rnd = random.Random(seed)
+    with open(db, "w", encoding="utf-8") as f:
+        for entry_id in range(count, 0, -1):
+            if binary_every and entry_id % binary_every == 0:
+                w, h = rnd.choice([(1920, 1080), (800, 600), (64, 64)])
+                size = w * h * 3 // 1024
+                f.write(f"{entry_id}\t[[ binary data {size} KiB png {w}x{h} ]]\n")
+            else:
+                words = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 30)))
+                f.write(f"{entry_id}\tclip {entry_id}: {words}"[:110] + "\n")
+
+
+def make_env(tmp, apps, clips):
+    home = os.path.join(tmp, "home")
+    bindir = os.path.join(tmp, "bin")
+    os.makedirs(os.path.join(home, ".cache"), exist_ok=True)
+    os.makedirs(bindir, exist_ok=True)
+    os.symlink(FAKE_CLIPHIST, os.path.join(bindir, "cliphist"))
+    # wl-copy stand-in: swallow the payload like the real one would
+    with open(os.path.join(bindir, "wl-copy"), "w") as f:
+        f.write("#!/bin/sh\nexec cat > /dev/null\n")
+    os.chmod(os.path.join(bindir, "wl-copy"), 0o755)
+
+    app_dirs = make_apps(os.path.join(tmp, "applications"), apps)
+    db = os.path.join(tmp, "cliphist.db")
+    make_history(db, clips)
+
+    env = dict(os.environ)
+    env.update({
+        "HOME": home,
+        "PATH": bindir + os.pathsep + env.get("PATH", ""),
+        "FAKE_CLIPHIST_DB": db,
+        "HUD_BENCH_APP_DIRS": os.pathsep.join(app_dirs),
+    })
+    return env
+
+
+# -- headless display --------------------------------------------------------
+
+def start_display(tmp, env, use_display):
+    """Return (env, process or None, backend name) or (None, None, reason)."""
+    if use_display and (env.get("WAYLAND_DISPLAY") or env.get("DISPLAY")):
+        return env, None, "existing"
+
+    runtime = os.path.join(tmp, "runtime")
+    os.makedirs(runtime, mode=0o700, exist_ok=True)
+    env = dict(env, XDG_RUNTIME_DIR=runtime)
+    env.pop("WAYLAND_DISPLAY", None)
+    env.pop("DISPLAY", None)
+
+    if shutil.which("weston"):
+        proc = subprocess.Popen(
+            ["weston", "--backend=headless-backend.so", "--socket=hud-bench",
+             "--width=1920", "--height=1080"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        sock = os.path.join(runtime, "hud-bench")
+        for _ in range(100):
+            if os.path.exists(sock):
+                return dict(env, WAYLAND_DISPLAY="hud-bench", GDK_BACKEND="wayland"), proc, "weston-headless"
+            time.sleep(0.05)
+        proc.terminate()
+
+    if shutil.which("Xvfb"):
+        display = ":97"
+        proc = subprocess.Popen(
+            ["Xvfb", display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        time.sleep(0.5)
+        if proc.poll() is None:
+            return dict(env, DISPLAY=display, GDK_BACKEND="x11"), proc, "xvfb"
+
+    return None, None, "no display (install weston or Xvfb, or pass --use-display)"
+
+
+# -- child scenarios ---------------------------------------------------------
+
+def scripts_path():
+    if SCRIPTS not in sys.path:
+        sys.path.insert(0, SCRIPTS)
+
+
+def load_script(fname, name):
+    scripts_path()
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS, fname))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - t) * 1000
+
+
+def latencies(fn, queries, rounds=5):
+    samples = []
+    for _ in range(rounds):
+        for q in queries:
+            _, ms = timed(fn, q)
+            samples.append(ms)
+    return samples
+
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * p / 100)))]
+
+
+def app_dirs():
+    return os.environ["HUD_BENCH_APP_DIRS"].split(os.pathsep)
+
+
+def launcher_entries():
+    """launcher_entries reading the synthetic app dirs, with no index yet."""
+    scripts_path()
+    import launcher_entries
+    launcher_entries.APP_DIRS = app_dirs()
+    try:
+        os.remove(launcher_entries.INDEX_FILE)
+    except FileNotFoundError:
+        pass
+    return launcher_entries
+
+
+def child_launcher_logic():
+    entries = launcher_entries()
+    from launcher_search import SearchIndex
+    apps, cold = timed(entries.load_desktop_entries)
+    _, warm = timed(entries.load_desktop_entries)
+    index, build = timed(SearchIndex, apps)
+    samples = latencies(index.scores, LAUNCHER_QUERIES)
+    return {
+        "apps": len(apps),
+        "load_cold_ms": cold,
+        "load_warm_ms": warm,
+        "search_index_ms": build,
+        "search_p50_ms": pct(samples, 50),
+        "search_p99_ms": pct(samples, 99),
+    }
+
+
+def child_clipboard_logic():
+    import itertools
+    scripts_path()
+    import clipboard_list
+    first_page = clipboard_list.PAGE_SIZE + clipboard_list.LOOKAHEAD
+    _, page = timed(lambda: list(itertools.islice(clipboard_list.iter_entries(), first_page)))
+    entries, load = timed(lambda: list(clipboard_list.iter_entries()))
+
+    def search(q):
+        return [e for e in entries if q in e["content"].lower()]
+
+    samples = latencies(search, CLIPBOARD_QUERIES)
+    return {
+        "entries": len(entries),
+        "first_page_ms": page,
+        "list_ms": load,
+        "search_p50_ms": pct(samples, 50),
+        "search_p99_ms": pct(samples, 99),
+    }
+
+
+def run_gtk(window, profiler, search_entry, queries):
+    from gi.repository import GLib, Gtk
+
+    deadline = time.monotonic() + GTK_TIMEOUT
+    # A 10 ms heartbeat: the longest gap is the worst main-loop stall
+    ticks = []
+    heartbeat = GLib.timeout_add(10, lambda: ticks.append(time.perf_counter()) or True)
+
+    def pump_until(cond):
+        while not cond() and time.monotonic() < deadline:
+            Gtk.main_iteration_do(True)
+
+    window.show_all()
+    pump_until(lambda: "first_draw" in profiler.phases and "populated" in profiler.phases)
+    first = profiler.phases.get("first_draw", [None, None])[1]
+    populated = profiler.phases.get("populated", [None, None])[1]
+
+    samples = []
+    for q in queries:
+        t = time.perf_counter()
+        search_entry.set_text(q)
+        while Gtk.events_pending():
+            Gtk.main_iteration_do(False)
+        samples.append((time.perf_counter() - t) * 1000)
+    search_entry.set_text("")
+
+    # Half a page per step through the list, events and redraws included
+    adj = window.list_view.adjustment
+    scrolls = []
+    for _ in range(SCROLL_STEPS):
+        t = time.perf_counter()
+        top = adj.get_upper() - adj.get_page_size()
+        adj.set_value(min(adj.get_value() + adj.get_page_size() / 2, top))
+        while Gtk.events_pending():
+            Gtk.main_iteration_do(False)
+        scrolls.append((time.perf_counter() - t) * 1000)
+    GLib.source_remove(heartbeat)
+    GLib.idle_add(Gtk.main_quit)
+    gaps = [(b - a) * 1000 for a, b in zip(ticks, ticks[1:])]
+    return {
+        "first_draw_ms": first,
+        "populated_ms": populated,
+        "keystroke_p50_ms": pct(samples, 50),
+        "keystroke_p99_ms": pct(samples, 99),
+        "scroll_p50_ms": pct(scrolls, 50),
+        "scroll_p99_ms": pct(scrolls, 99),
+        "scrolled_rows": len(window.list_view.items),
+        "max_stall_ms": max(gaps) if gaps else None,
+    }
+
+
+def child_launcher_gtk():
+    start = time.monotonic()
+    entries = launcher_entries()
+    mod = load_script("launcher-ui.py", "bench_launcher")
+    _, cold = timed(entries.load_desktop_entries)
+    _, warm = timed(entries.load_desktop_entries)
+    profiler = mod.Profiler("launcher", start=start)
+    win = mod.AppLauncher(profiler, resident=True)
+    result = {"load_cold_ms": cold, "load_warm_ms": warm}
+    result.update(run_gtk(win, profiler, win.search_entry, LAUNCHER_QUERIES))
+    return result
+
+
+def child_clipboard_gtk():
+    start = time.monotonic()
+    mod = load_script("clipboard-ui.py", "bench_clipboard")
+    import clipboard_list
+    profiler = mod.Profiler("clipboard", start=start)
+    # Standalone: a resident window only reads the history once popped up
+    win = mod.ClipboardManager(profiler)
+    result = run_gtk(win, profiler, win.search_entry, CLIPBOARD_QUERIES)
+    binary = next((e for e in clipboard_list.iter_entries()
+                   if "1920x1080" in e["content"]), None)
+    if binary:
+        line = clipboard_list.entry_line(binary)
+        result["copy_1080p_ms"] = timed(lambda: mod.check_copy(mod.copy_entry(line)))[1]
+    return result
+
+
+CHILDREN = {
+    "launcher-logic": child_launcher_logic,
+    "clipboard-logic": child_clipboard_logic,
+    "launcher-gtk": child_launcher_gtk,
+    "clipboard-gtk": child_clipboard_gtk,
+}
+
+
+def run_child(name):
+    try:
+        result = CHILDREN[name]()
+    except ImportError as e:
+        result = {"skipped": f"import failed: {e}"}
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+
+# -- parent ------------------------------------------------------------------
+
+def run_scenario(name, env):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name],
+        env=env, capture_output=True, text=True, timeout=GTK_TIMEOUT * 2,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"error": tail}
+    return json.loads(lines[-1])
+
+
+def print_results(results, out=sys.stdout):
+    for name, result in results.items():
+        print(f"\n[{name}]", file=out)
+        for key, value in result.items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            print(f"  {key:<20} {value}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tech HUD headless load test")
+    parser.add_argument("--apps", type=int, default=5000)
+    parser.add_argument("--clips", type=int, default=50000)
+    parser.add_argument("--only", choices=SCENARIOS, action="append")
+    parser.add_argument("--no-gtk", action="store_true")
+    parser.add_argument("--use-display", action="store_true",
+                        help="run GTK scenarios on the current display")
+    parser.add_argument("--cliphist-delay", type=float, default=0,
+                        help="seconds fake cliphist sleeps per command (stress)")
+    parser.add_argument("--keep", action="store_true", help="keep the temp tree")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="hud-bench-")
+    display_proc = None
+    try:
+        t = time.perf_counter()
+        env = make_env(tmp, args.apps, args.clips)
+        if args.cliphist_delay:
+            env["FAKE_CLIPHIST_DELAY"] = str(args.cliphist_delay)
+        print(f"generated {args.apps} apps, {args.clips} clips in "
+              f"{time.perf_counter() - t:.1f}s under {tmp}", file=sys.stderr)
+
+        scenarios = args.only or SCENARIOS
+        results = {}
+        gtk_env = None
+        has_gi = importlib.util.find_spec("gi") is not None
+        for name in scenarios:
+            if name.endswith("-gtk"):
+                if args.no_gtk:
+                    continue
+                if not has_gi:
+                    results[name] = {"skipped": "PyGObject (gi) is not installed"}
+                    continue
+                if gtk_env is None:
+                    gtk_env, display_proc, backend = start_display(tmp, env, args.use_display)
+                    if gtk_env is None:
+                        gtk_env = False
+                        skip_reason = backend
+                    else:
+                        print(f"GTK backend: {backend}", file=sys.stderr)
+                if gtk_env is False:
+                    results[name] = {"skipped": skip_reason}
+                    continue
+                results[name] = run_scenario(name, gtk_env)
+            else:
+                results[name] = run_scenario(name, env)
+
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_results(results)
+    finally:
+        if display_proc is not None:
+            display_proc.send_signal(signal.SIGTERM)
+            display_proc.wait(timeout=10)
+        if args.keep:
+            print(f"kept {tmp}", file=sys.stderr)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
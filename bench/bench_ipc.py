@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Hyprland IPC checks and timings against FakeHyprland (no compositor).
+
+Checks requests, dispatch and batch replies (including error lines),
+the event stream, the power menu's close flow and the launcher's client
+table, then times a request, a dispatch and a batch.
+
+    bench/bench_ipc.py [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import select
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "waybar", "scripts"))
+
+from hud_ipc import CloseWindows, FakeHyprland, Hyprland, IPCError  # noqa: E402
+from launcher_running import ClientTable  # noqa: E402
+
+EVENT_WAIT = 1.0
+
+CLIENTS = [
+    {"address": "0x5a3e", "class": "kitty", "title": "~", "mapped": True,
+     "focusHistoryID": 1},
+    {"address": "0x77b0", "class": "firefox", "title": "Mozilla Firefox",
+     "mapped": True, "focusHistoryID": 0},
+    {"address": "0x9c10", "class": "hidden", "title": "", "mapped": False,
+     "focusHistoryID": 2},
+]
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    if not ok:
+        failures.append(name)
+    print(f"{'ok' if ok else 'FAIL':>4}  {name}" + (f"  ({detail})" if detail and not ok else ""))
+
+
+def raises(fn):
+    try:
+        fn()
+    except IPCError as e:
+        return str(e)
+    return None
+
+
+def wait_for(source, done):
+    """read() from source whenever it is readable until done(result)."""
+    deadline = time.monotonic() + EVENT_WAIT
+    while time.monotonic() < deadline:
+        ready, _, _ = select.select([source], [], [], deadline - time.monotonic())
+        if ready and done(source.read()):
+            return True
+    return False
+
+
+def check_requests(fake, hypr):
+    check("json decodes a query", hypr.json("clients") == CLIENTS)
+    check("json rejects a non-JSON reply", raises(lambda: hypr.json("version")) is not None)
+
+    hypr.dispatch("exit")
+    check("dispatch sends one request", fake.requests[-1] == "dispatch exit")
+    error = raises(lambda: hypr.dispatch("bad"))
+    check("dispatch raises on an error reply", error == "hyprland: Invalid dispatcher",
+          repr(error))
+
+    hypr.batch(["dispatch a", "keyword b 1"])
+    check("batch sends one request", fake.requests[-1] == "[[BATCH]]dispatch a;keyword b 1")
+    before = len(fake.requests)
+    hypr.batch([])
+    check("empty batch sends nothing", len(fake.requests) == before)
+    # An error whose text holds "ok" must still count as an error
+    error = raises(lambda: hypr.batch(["dispatch focuswindow address:0x1", "dispatch nook"]))
+    check("batch raises on an error line holding 'ok'",
+          error == "hyprland: Invalid dispatcher nook", repr(error))
+
+    check("no instance raises", raises(lambda: Hyprland("").request("x")) is not None)
+
+
+def check_events(fake, hypr):
+    events = hypr.events()
+    try:
+        fake.emit("openwindow", "5a3e,1,kitty,~")
+        fake.emit("workspace", "2")
+        got = []
+        wait_for(events, lambda batch: got.extend(batch) or len(got) >= 2)
+        check("event stream parses lines",
+              got == [("openwindow", "5a3e,1,kitty,~"), ("workspace", "2")], repr(got))
+        fake.drop_event_clients()
+        select.select([events], [], [], EVENT_WAIT)
+        check("closed event socket raises", raises(events.read) is not None)
+    finally:
+        events.close()
+
+
+def check_close_windows(fake, hypr):
+    closer = CloseWindows(hypr)
+    try:
+        check("close flow batches one closewindow per mapped window",
+              fake.requests[-1] == "[[BATCH]]dispatch closewindow address:0x5a3e;"
+              "dispatch closewindow address:0x77b0", fake.requests[-1])
+        check("close flow counts the windows", closer.total == 2 and closer.names()
+              == ["firefox", "kitty"], repr(closer.names()))
+        fake.emit("closewindow", "5a3e")
+        fake.emit("closewindow", "dead")
+        wait_for(closer, lambda done: closer.names() == ["firefox"])
+        check("close flow follows closewindow events", closer.names() == ["firefox"],
+              repr(closer.names()))
+        fake.emit("closewindow", "77b0")
+        check("close flow finishes with the last window", wait_for(closer, bool))
+    finally:
+        closer.close()
+
+    closer = CloseWindows(hypr)
+    try:
+        fake.drop_event_clients()
+        check("close flow finishes when the compositor goes away",
+              wait_for(closer, bool))
+    finally:
+        closer.close()
+
+
+def check_client_table(fake, hypr):
+    table = ClientTable(hypr)
+    kitty = {"file": "kitty.desktop", "wmclass": ""}
+    nautilus = {"file": "org.gnome.Nautilus.desktop"}
+    try:
+        check("client table connects", table.connect())
+        check("client table skips unmapped windows", set(table.clients) == {"5a3e", "77b0"})
+        check("client table finds a running app", table.find(kitty) == "5a3e")
+        check("client table: a terminal app never counts as running",
+              not table.is_running({"file": "kitty.desktop", "terminal": True}))
+
+        fake.emit("openwindow", "aa01,1,org.gnome.Nautilus,Files")
+        wait_for(table, bool)
+        check("client table follows openwindow", table.is_running(nautilus))
+        fake.emit("openwindow", "aa02,1,kitty,~")
+        wait_for(table, bool)
+        check("client table prefers the newest kitty", table.find(kitty) == "aa02")
+        fake.emit("activewindowv2", "5a3e")
+        fake.emit("closewindow", "aa01")
+        wait_for(table, bool)
+        check("client table follows closewindow", not table.is_running(nautilus))
+        check("client table follows focus", table.find(kitty) == "5a3e")
+
+        table.focus("5a3e")
+        check("client table focuses by address",
+              fake.requests[-1] == "dispatch focuswindow address:0x5a3e")
+
+        fake.drop_event_clients()
+        closed = False
+        try:
+            wait_for(table, lambda changed: False)
+        except IPCError:
+            closed = True
+        check("client table empties when the compositor goes away",
+              closed and not table.is_running(kitty))
+    finally:
+        table.disconnect()
+
+    check("client table without Hyprland stays empty",
+          not ClientTable(Hyprland("")).connect())
+
+
+def bench(hypr, rounds):
+    for label, fn in (
+        ("request", lambda: hypr.json("clients")),
+        ("dispatch", lambda: hypr.dispatch("exit")),
+        ("batch x20", lambda: hypr.batch([f"dispatch closewindow address:0x{i:x}"
+                                          for i in range(20)])),
+    ):
+        times = []
+        for _ in range(rounds):
+            t = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t)
+        times.sort()
+        print(f"{label:>10}: p50 {times[len(times) // 2] * 1e6:7.1f} us  "
+              f"p99 {times[int(len(times) * 0.99)] * 1e6:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    replies = {
+        "j/clients": json.dumps(CLIENTS),
+        "j/version": "unknown request",
+        "dispatch bad": "Invalid dispatcher",
+        "[[BATCH]]dispatch focuswindow address:0x1;dispatch nook":
+            "ok\n\nInvalid dispatcher nook",
+    }
+    with FakeHyprland(replies) as fake:
+        hypr = Hyprland(fake.dir)
+        check_requests(fake, hypr)
+        check_events(fake, hypr)
+        check_close_windows(fake, hypr)
+        check_client_table(fake, hypr)
+        print(f"checks: {len(failures)} failed" if failures else "checks: all passed")
+        bench(hypr, args.rounds)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Tech HUD — shell-free spawning of desktop entries (GTK-free)"""
+
+import json
+import os
+import shutil
+import time
+
+LAUNCH_LOG = os.path.expanduser("~/.cache/launcher-launches.jsonl")
+LAUNCH_LOG_MAX = 256 * 1024
+
+# (binary, args placed before the command); $TERMINAL wins if set
+TERMINALS = [
+    ("kitty", []),
+    ("foot", []),
+    ("alacritty", ["-e"]),
+    ("wezterm", ["start", "--"]),
+    ("xterm", ["-e"]),
+]
+
+
+class LaunchError(Exception):
+    pass
+
+
+def tryexec_ok(tryexec):
+    """TryExec (spec §6): absolute path must be executable, else on PATH."""
+    if not tryexec:
+        return True
+    if os.path.isabs(tryexec):
+        return os.access(tryexec, os.X_OK)
+    return shutil.which(tryexec) is not None
+
+
+def find_terminal():
+    env = os.environ.get("TERMINAL")
+    if env and shutil.which(env):
+        return [env, "-e"]
+    for binary, args in TERMINALS:
+        if shutil.which(binary):
+            return [binary] + args
+    return None
+
+
+def build_command(app):
+    """Return (argv, cwd) for a launcher record, honouring Terminal/Path."""
+    argv = list(app.get("argv") or [])
+    if not argv:
+        raise LaunchError(f"{app.get('file', '?')}: no valid Exec")
+    if app.get("terminal"):
+        terminal = find_terminal()
+        if terminal is None:
+            raise LaunchError("Terminal=true but no terminal emulator found")
+        argv = terminal + argv
+    return argv, app.get("path") or None
+
+
+def spawn(argv, cwd=None):
+    """Start argv without a shell, detached from this process.
+
+    GLib forks and execs in C, so no Python runs in the child (os.fork()
+    is unsafe once the resident host has threads). Without
+    DO_NOT_REAP_CHILD it goes through an intermediate child that it reaps
+    itself, so the app is reparented to init and nothing is left to reap.
+    Exec and chdir failures raise LaunchError.
+    """
+    from gi.repository import GLib
+
+    flags = (
+        GLib.SpawnFlags.SEARCH_PATH
+        | GLib.SpawnFlags.STDOUT_TO_DEV_NULL
+        | GLib.SpawnFlags.STDERR_TO_DEV_NULL
+    )
+    try:
+        GLib.spawn_async(argv=argv, working_directory=cwd, flags=flags)
+    except GLib.Error as e:
+        raise LaunchError(e.message)
+
+
+def launch(app, started=None):
+    """Spawn a launcher record and log how long it took.
+
+    started is a time.monotonic() stamp from the click, so the logged
+    total includes closing the popup.
+    """
+    argv, cwd = build_command(app)
+    t0 = time.monotonic()
+    spawn(argv, cwd)
+    t1 = time.monotonic()
+    log_launch({
+        "ts": time.time(),
+        "file": app.get("file", ""),
+        "argv0": argv[0],
+        "spawn_ms": round((t1 - t0) * 1000, 2),
+        "total_ms": round((t1 - (started or t0)) * 1000, 2),
+    })
+
+
+def log_launch(record):
+    try:
+        os.makedirs(os.path.dirname(LAUNCH_LOG), exist_ok=True)
+        try:
+            if os.path.getsize(LAUNCH_LOG) > LAUNCH_LOG_MAX:
+                os.replace(LAUNCH_LOG, LAUNCH_LOG + ".1")
+        except FileNotFoundError:
+            pass
+        with open(LAUNCH_LOG, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
@@ -1,19 +1,54 @@
 #!/usr/bin/env python3
 """Tech HUD Clipboard Manager — GTK3 + Layer Shell"""
 
+import collections
+import os
+import sys
+import time
+
+STARTED = time.monotonic()
+
+# Thin client: if hud-host.py is running, hand it the toggle and skip GTK
+if __name__ == "__main__":
+    import hud_host
+    if hud_host.forward("clipboard"):
+        sys.exit(0)
+
 import gi
 import subprocess
 import json
-import os
 import signal
+import threading
 
 gi.require_version("Gtk", "3.0")
 gi.require_version("GtkLayerShell", "0.1")
 from gi.repository import Gtk, Gdk, GtkLayerShell, GLib, Pango
 
+from clipboard_history import (
+    LOOKAHEAD, PAGE_SIZE, PREVIEW_WIDTH, CliphistQueue, HistoryStream,
+    HistoryWatcher,
+)
+from clipboard_list import entry_line, is_binary
+from clipboard_preview import PREVIEW_HEIGHT, PreviewCache
+from clipboard_thumbs import ThumbnailCache, is_image
+from hud_profile import Profiler
+from hud_vlist import VirtualList, set_class
+
+IMPORTED = time.monotonic()
+
 PINS_FILE = os.path.expanduser("~/.cache/clipboard-pins.json")
+# Preview lines of pinned entries, so pins show before the stream reaches them
+PIN_LINES_FILE = os.path.expanduser("~/.cache/clipboard-pin-lines.json")
 CSS_FILE = os.path.expanduser("~/.config/waybar/scripts/clipboard-ui.css")
 PID_FILE = "/tmp/clipboard-ui.pid"
+RECENT_LABEL = "  RECENT"
+# Hover or cursor must rest this long before an entry is decoded
+PREVIEW_DELAY_MS = 150
+# Typing must pause this long before a search that re-lists the history
+SEARCH_DELAY_MS = 200
+# Unfiltered rows kept in memory on either side of the view; farther ones
+# are dropped once twice this many build up, and read again on the way back
+WINDOW_SLACK = max(LOOKAHEAD, PAGE_SIZE)
 
 
 def load_pins():
@@ -30,37 +65,98 @@ def save_pins(pins):
         json.dump(pins, f)
 
 
-def get_clipboard_entries():
-    result = subprocess.run(["cliphist", "list"], capture_output=True, text=True)
-    entries = []
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            continue
-        tab = line.find("\t")
-        if tab == -1:
-            continue
-        entry_id = line[:tab]
-        content = line[tab + 1 :]
-        entries.append({"id": entry_id, "content": content, "raw": line})
-    return entries
+def load_pin_lines():
+    try:
+        with open(PIN_LINES_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
 
-def copy_entry(raw_line):
-    proc = subprocess.Popen(
-        ["cliphist", "decode"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
-    )
-    decoded, _ = proc.communicate(raw_line.encode())
-    subprocess.Popen(["wl-copy"], stdin=subprocess.PIPE).communicate(decoded)
+def save_pin_lines(lines):
+    os.makedirs(os.path.dirname(PIN_LINES_FILE), exist_ok=True)
+    with open(PIN_LINES_FILE, "w") as f:
+        json.dump(lines, f)
 
 
-def delete_entry(raw_line):
-    proc = subprocess.Popen(["cliphist", "delete"], stdin=subprocess.PIPE)
-    proc.communicate(raw_line.encode())
+class CopyError(Exception):
+    pass
+
+
+def copy_entry(line):
+    """Start `cliphist decode | wl-copy` joined by an OS pipe, so the
+    payload never passes through Python; returns both processes."""
+    try:
+        decode = subprocess.Popen(
+            ["cliphist", "decode"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+    except OSError as e:
+        raise CopyError(f"cliphist: {e.strerror}")
+    try:
+        copy = subprocess.Popen(["wl-copy"], stdin=decode.stdout)
+    except OSError as e:
+        decode.kill()
+        decode.wait()
+        raise CopyError(f"wl-copy: {e.strerror}")
+    finally:
+        # wl-copy now holds the only read end
+        decode.stdout.close()
+    try:
+        decode.stdin.write(line.encode())
+        decode.stdin.close()
+    except BrokenPipeError:
+        pass
+    return decode, copy
+
+
+def check_copy(procs):
+    """Wait for a copy pipeline; CopyError names the step that failed."""
+    for proc in procs:
+        if proc.wait() != 0:
+            raise CopyError(f"{proc.args[0]} exited with status {proc.returncode}")
+
+
+def _report_copy(procs):
+    try:
+        check_copy(procs)
+    except CopyError as e:
+        print(f"clipboard: copy failed: {e}", file=sys.stderr)
 
 
 class ClipboardManager(Gtk.Window):
-    def __init__(self):
+    def __init__(self, profiler=None, resident=False):
         super().__init__()
+        self.resident = resident
+        self.profiler = profiler or Profiler("clipboard")
+        self.profiler.watch(self)
+        # Every cliphist list/delete/wipe goes through here, in order
+        self.queue = CliphistQueue(self._on_busy)
+        self.closing = False
+        self.stream = None
+        self.search_stream = None
+        # Reads entries copied while the window is open
+        self.head_stream = None
+        self.head_entries = []
+        self.head_again = False
+        self.watcher = HistoryWatcher(self._on_history_changed)
+        # A window of the history, newest first: skipped_above entries
+        # above it were dropped, and above_stream reads them back
+        self.entries = []
+        self.skipped_above = 0
+        self.newest_id = None
+        self.above_stream = None
+        self.above_entries = None
+        self._sliding = False
+        self._search_source = None
+        self.index = None
+        self.index_fresh = False
+        self.thumbs = ThumbnailCache()
+        self.previews = PreviewCache()
+        self.preview_entry = None
+        self._preview_source = None
+        # id -> entry; survives searches, so a selection can be built up
+        self.selected = {}
+        self._selecting_all = False
 
         GtkLayerShell.init_for_window(self)
         GtkLayerShell.set_layer(self, GtkLayerShell.Layer.OVERLAY)
@@ -76,24 +172,33 @@ class ClipboardManager(Gtk.Window):
         self.set_size_request(550, 600)
         self.get_style_context().add_class("clipboard-window")
 
-        self._load_css()
-        self.pins = load_pins()
-        self.entries = get_clipboard_entries()
-        self._build_ui()
+        with self.profiler.phase("css"):
+            self._load_css()
+        self._load_pins()
+        with self.profiler.phase("build_ui"):
+            self._build_ui()
+        if not resident:
+            # A resident window reads the history and watches it only while
+            # shown: popup() starts both, _quit() stops them
+            self._open_stream()
+            self.watcher.start()
         self.connect("key-press-event", self._on_key)
 
     def _load_css(self):
-        css_provider = Gtk.CssProvider()
-        try:
-            css_provider.load_from_path(CSS_FILE)
-        except GLib.Error:
-            pass
+        self.css_provider = Gtk.CssProvider()
+        self.reload_css()
         Gtk.StyleContext.add_provider_for_screen(
             Gdk.Screen.get_default(),
-            css_provider,
+            self.css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
 
+    def reload_css(self):
+        try:
+            self.css_provider.load_from_path(CSS_FILE)
+        except GLib.Error:
+            pass
+
     def _build_ui(self):
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         main_box.get_style_context().add_class("main-box")
@@ -113,9 +218,26 @@ class ClipboardManager(Gtk.Window):
         clear_btn.connect("clicked", self._on_clear_all)
         header.pack_end(clear_btn, False, False, 0)
 
-        count = Gtk.Label(label=f"{len(self.entries)}")
-        count.get_style_context().add_class("header-count")
-        header.pack_end(count, False, False, 8)
+        self.delete_sel_btn = Gtk.Button(label="DELETE")
+        self.delete_sel_btn.get_style_context().add_class("clear-all-btn")
+        self.delete_sel_btn.connect("clicked", lambda b: self._delete_selected())
+        self.delete_sel_btn.set_no_show_all(True)
+        header.pack_end(self.delete_sel_btn, False, False, 4)
+
+        self.select_btn = Gtk.Button(label="SELECT ALL")
+        self.select_btn.get_style_context().add_class("select-btn")
+        self.select_btn.set_tooltip_text("Select every entry matching the search")
+        self.select_btn.connect("clicked", self._on_select_clicked)
+        header.pack_end(self.select_btn, False, False, 4)
+
+        self.spinner = Gtk.Spinner()
+        self.spinner.get_style_context().add_class("header-spinner")
+        self.spinner.set_no_show_all(True)
+        header.pack_end(self.spinner, False, False, 4)
+
+        self.count_label = Gtk.Label(label="")
+        self.count_label.get_style_context().add_class("header-count")
+        header.pack_end(self.count_label, False, False, 8)
 
         main_box.pack_start(header, False, False, 0)
 
@@ -126,156 +248,738 @@ class ClipboardManager(Gtk.Window):
         self.search_entry.connect("changed", self._on_search_changed)
         main_box.pack_start(self.search_entry, False, False, 0)
 
-        # Scrollable list
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
+        # Only the rows on screen exist; they are rebound while scrolling.
+        # Items are (entry, is_pinned), or (None, label) for a section label
+        self.list_view = VirtualList(
+            self._make_row, self._bind_row, self._toggle_selected,
+            lambda item: self._schedule_preview(item[0]),
+        )
+        self.list_view.get_style_context().add_class("entries-list")
+        self.list_view.adjustment.connect("value-changed", self._on_scroll)
+        main_box.pack_start(self.list_view, True, True, 0)
+
+        # Full content of the hovered or cursor entry
+        self.preview_pane = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.preview_pane.get_style_context().add_class("preview-pane")
+        self.preview_pane.set_no_show_all(True)
+        self.preview_info = Gtk.Label()
+        self.preview_info.get_style_context().add_class("preview-info")
+        self.preview_info.set_halign(Gtk.Align.START)
+        self.preview_info.show()
+        self.preview_pane.pack_start(self.preview_info, False, False, 0)
+
+        preview_scroll = Gtk.ScrolledWindow()
+        preview_scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        preview_scroll.set_size_request(-1, PREVIEW_HEIGHT)
+        preview_body = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.preview_text = Gtk.Label()
+        self.preview_text.get_style_context().add_class("preview-text")
+        self.preview_text.set_xalign(0)
+        self.preview_text.set_yalign(0)
+        preview_body.pack_start(self.preview_text, False, False, 0)
+        self.preview_image = Gtk.Image()
+        preview_body.pack_start(self.preview_image, False, False, 0)
+        preview_scroll.add(preview_body)
+        preview_scroll.show_all()
+        self.preview_pane.pack_start(preview_scroll, True, True, 0)
+        main_box.pack_end(self.preview_pane, False, False, 0)
+
+    def _load_pins(self):
+        self.pins = load_pins()
+        lines = load_pin_lines()
+        # id -> entry for pins whose preview is known; older pins are
+        # picked up as the stream passes them
+        self.pinned = {
+            pid: {"id": pid, "content": lines[pid]} for pid in self.pins if pid in lines
+        }
+
+    def _open_stream(self):
+        """Start streaming the history from the top (window open/popup)."""
+        self._close_streams()
+        self.entries = []
+        self.skipped_above = 0
+        self.newest_id = None
+        self.index_fresh = False
+        self._stream_started = time.monotonic()
+        self.stream = HistoryStream(
+            self.queue, self._on_stream_entries, self._on_stream_done
+        )
+        self._populate_entries(self.search_entry.get_text())
 
-        self.list_box = Gtk.ListBox()
-        self.list_box.get_style_context().add_class("entries-list")
-        self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
-        scroll.add(self.list_box)
-        main_box.pack_start(scroll, True, True, 0)
+    def _close_streams(self):
+        streams = (self.stream, self.search_stream, self.head_stream, self.above_stream)
+        for stream in streams:
+            if stream:
+                stream.close()
+        self.stream = self.search_stream = self.head_stream = None
+        self.above_stream = self.above_entries = None
+        self.head_again = False
+
+    def _history_loaded(self):
+        """Every entry is in self.entries: none dropped, none left to read."""
+        return not self.skipped_above and (self.stream is None or self.stream.exhausted)
+
+    def _update_count(self):
+        suffix = "" if self._history_loaded() else "+"
+        self.count_label.set_text(f"{self.skipped_above + len(self.entries)}{suffix}")
+
+    def _on_stream_entries(self, batch):
+        if self.newest_id is None:
+            self.newest_id = int(batch[0]["id"])
+            self.profiler.record("first_page", self._stream_started, time.monotonic())
+            self._check_index(batch[0])
+        self.entries.extend(batch)
+        if self._selecting_all and self.search_stream is None:
+            self._select_entries(batch)
+        found = [e for e in batch if e["id"] in self.pins and e["id"] not in self.pinned]
+        if found:
+            for entry in found:
+                self.pinned[entry["id"]] = entry
+            self._save_pins()
+            self._populate_entries(self.search_entry.get_text())
+        elif self.search_stream is None:
+            ft = self.search_entry.get_text().lower()
+            self.list_view.items.extend(
+                (e, False) for e in batch
+                if e["id"] not in self.pinned and (not ft or ft in e["content"].lower())
+            )
+            self.list_view.changed()
+        self._update_count()
+        self._check_populated()
+
+    def _open_index(self):
+        if self.index is None:
+            # Imported on first use: sqlite3 alone costs ~10 ms of startup
+            from clipboard_index import ClipIndex
+            self.index = ClipIndex.open_existing()
+        return self.index
+
+    def _check_index(self, newest):
+        # Only trust the index when the indexer has seen the newest entry;
+        # otherwise search falls back to scanning previews
+        index = self._open_index()
+        self.index_fresh = bool(index) and index.max_id() >= int(newest["id"])
+
+    def _on_stream_done(self):
+        self._update_count()
+        self._check_populated()
+
+    # -- live updates ----------------------------------------------------
+
+    def _on_history_changed(self):
+        if self.head_stream is not None:
+            self.head_again = True
+            return
+        newest = self.newest_id
+        if newest is None:
+            if self.stream is not None and not self.stream.exhausted:
+                return  # the first page will include it
+            newest = 0
+        # Only what is newer than the top row; the list is never reread
+        self.head_entries = []
+        self.head_stream = HistoryStream(
+            self.queue, self.head_entries.extend, self._on_head_done,
+            wanted=sys.maxsize, after=newest,
+        )
 
-        self._populate_entries()
+    def _on_head_done(self):
+        self.head_stream = None
+        new, self.head_entries = self.head_entries, []
+        if new:
+            self._prepend_entries(new)
+        if self.head_again:
+            self.head_again = False
+            self._on_history_changed()
+
+    def _prepend_entries(self, new):
+        # cliphist moves a re-copied entry to the top under a new ID, so
+        # the old row is gone. Truncated previews may differ further on
+        # and are left alone, and so are binary ones: two images of one
+        # size and type share a preview
+        contents = {
+            e["content"] for e in new
+            if len(e["content"]) < PREVIEW_WIDTH and not is_binary(e["content"])
+        }
+        moved = {
+            e["id"] for e in self.entries
+            if e["content"] in contents and e["id"] not in self.pinned
+        }
+        if moved:
+            self.entries = [e for e in self.entries if e["id"] not in moved]
+            self.list_view.items[:] = [
+                item for item in self.list_view.items
+                if item[0] is None or item[0]["id"] not in moved
+            ]
+            self.list_view.changed()
+        self.newest_id = int(new[0]["id"])
+        self._check_index(new[0])
+        if self.skipped_above:
+            # Above the dropped entries: read back when scrolled up to
+            self.skipped_above += len(new)
+            self._update_count()
+            return
+        self.entries[0:0] = new
+
+        # Rows go right under the RECENT label, filtered like the rest
+        ft = self.search_entry.get_text().lower()
+        self.list_view.insert(self._recent_top(), [
+            (e, False) for e in new
+            if e["id"] not in self.pinned and (not ft or ft in e["content"].lower())
+        ])
+        self._update_count()
+
+    def _recent_top(self):
+        """Index of the first row under the RECENT label."""
+        items = self.list_view.items
+        return next(i for i, (e, label) in enumerate(items) if label == RECENT_LABEL) + 1
+
+    def _on_search_entries(self, batch):
+        if self._selecting_all:
+            self._select_entries(batch)
+        self.list_view.items.extend((e, False) for e in batch if e["id"] not in self.pinned)
+        self.list_view.changed()
+        self._check_populated()
+
+    def _active_stream(self):
+        return self.search_stream or self.stream
+
+    def _check_populated(self):
+        # The first page plus lookahead is read (rows on screen are bound
+        # as items arrive)
+        stream = self._active_stream()
+        if stream is None or stream.paused or stream.delivered >= stream.wanted:
+            self.profiler.mark("populated")
+
+    def _on_scroll(self, adj):
+        if self._sliding:
+            return
+        if self.search_stream is None and not self.search_entry.get_text():
+            self._slide_window()
+        stream = self._active_stream()
+        if stream is None or stream.exhausted:
+            return
+        # Keep LOOKAHEAD rows read beyond the last one on screen
+        below = len(self.list_view.items) - self.list_view.visible_range()[1]
+        stream.want(stream.delivered + LOOKAHEAD - below)
+
+    # -- sliding window ----------------------------------------------------
+
+    def _slide_window(self):
+        """Keep the unfiltered list to the rows around the view, so memory
+        follows the view and not how far the list was scrolled."""
+        items = self.list_view.items
+        top = self._recent_top()
+        first, last = self.list_view.visible_range()
+        first, last = max(first - top, 0), max(last - top, 0)
+        self._sliding = True
+        try:
+            if not self._selecting_all and len(items) - top - last > 2 * WINDOW_SLACK:
+                self._drop_below(top + last + WINDOW_SLACK)
+            if self.above_stream is None:
+                if first > 2 * WINDOW_SLACK:
+                    self._drop_above(top, first - WINDOW_SLACK)
+                elif self.skipped_above and first < WINDOW_SLACK // 2:
+                    self._read_above()
+        finally:
+            self._sliding = False
+
+    def _entry_index(self, entry):
+        return next(i for i, e in enumerate(self.entries) if e is entry)
+
+    def _drop_below(self, keep):
+        last = self.list_view.items[keep - 1][0]
+        del self.entries[self._entry_index(last) + 1:]
+        self.list_view.remove(keep, len(self.list_view.items))
+        # Read on from the last row kept once scrolled back down
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = HistoryStream(
+            self.queue, self._on_stream_entries, self._on_stream_done,
+            wanted=0, before=int(last["id"]),
+        )
 
-    def _add_section_label(self, text):
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-        row.set_activatable(False)
-        lbl = Gtk.Label(label=text)
-        lbl.get_style_context().add_class("section-label")
-        lbl.set_halign(Gtk.Align.START)
-        row.add(lbl)
-        self.list_box.add(row)
+    def _drop_above(self, top, count):
+        last = self.list_view.items[top + count - 1][0]
+        cut = self._entry_index(last) + 1
+        self.skipped_above += cut
+        del self.entries[:cut]
+        self.list_view.remove(top, top + count)
+
+    def _read_above(self):
+        if not self.entries:
+            # Every row kept was deleted: start over from the top
+            self._open_stream()
+            return
+        # Everything newer than the top row is re-listed; only the rows
+        # right above it are kept
+        self.above_entries = collections.deque(maxlen=WINDOW_SLACK)
+        self.above_stream = HistoryStream(
+            self.queue, self.above_entries.extend, self._on_above_done,
+            wanted=sys.maxsize, after=int(self.entries[0]["id"]),
+        )
+
+    def _on_above_done(self):
+        stream, self.above_stream = self.above_stream, None
+        block, self.above_entries = list(self.above_entries), None
+        self.skipped_above = stream.delivered - len(block)
+        if block:
+            if not self.skipped_above:
+                self.newest_id = int(block[0]["id"])
+            self.entries[0:0] = block
+            self.list_view.insert(
+                self._recent_top(),
+                [(e, False) for e in block if e["id"] not in self.pinned],
+            )
+        self._update_count()
 
     def _populate_entries(self, filter_text=""):
-        for child in self.list_box.get_children():
-            self.list_box.remove(child)
+        self._hide_preview()
+        self._selecting_all = False
+        self.thumbs.cancel_pending()
+        if self.search_stream:
+            self.search_stream.close()
+            self.search_stream = None
 
         ft = filter_text.lower()
-        pinned = [e for e in self.entries if e["id"] in self.pins]
-        unpinned = [e for e in self.entries if e["id"] not in self.pins]
+        if not ft and self.skipped_above:
+            # The list starts at the newest entry, which was dropped
+            self._open_stream()
+            return
 
+        # (entry, is_pinned); entry None means a section label
+        items = []
+        pinned = [e for e in self.pinned.values() if not ft or ft in e["content"].lower()]
         if pinned:
-            self._add_section_label("  PINNED")
-            for entry in pinned:
+            items.append((None, "  PINNED"))
+            items.extend((entry, True) for entry in pinned)
+
+        items.append((None, RECENT_LABEL))
+        use_index = ft and self.index_fresh
+        if not use_index and (not ft or self._history_loaded()):
+            for entry in self.entries:
+                if entry["id"] in self.pinned:
+                    continue
                 if ft and ft not in entry["content"].lower():
                     continue
-                self.list_box.add(self._make_row(entry, True))
-
-        self._add_section_label("  RECENT")
-        for entry in unpinned:
-            if ft and ft not in entry["content"].lower():
-                continue
-            self.list_box.add(self._make_row(entry, False))
-
-        self.list_box.show_all()
-
-    def _make_row(self, entry, is_pinned):
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-        row.set_activatable(False)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-        box.get_style_context().add_class("entry-row")
-        if is_pinned:
-            box.get_style_context().add_class("pinned")
-
-        # Icon
-        content = entry["content"]
-        is_binary = content.startswith("[[ binary data")
-        icon_text = "󰋩" if is_binary else "󰧮"
-
-        icon = Gtk.Label(label=icon_text)
-        icon.get_style_context().add_class("entry-icon")
-        box.pack_start(icon, False, False, 4)
+                items.append((entry, False))
+
+        self.list_view.set_items(items)
+
+        if use_index:
+            # Ranked prefix matches over the full text of every entry
+            from clipboard_index import SearchResults
+            self.search_stream = SearchResults(
+                self.index, filter_text, self._on_search_entries,
+                self._check_populated, PAGE_SIZE + LOOKAHEAD,
+            )
+        elif ft and not self._history_loaded():
+            # Only part of the history is in memory: stream the matches
+            self.search_stream = HistoryStream(
+                self.queue,
+                self._on_search_entries,
+                self._check_populated,
+                match=lambda e: ft in e["content"].lower(),
+            )
+        self._check_populated()
+
+    def _make_row(self):
+        # One pooled row serves both section labels and entries; buttons
+        # act on whatever item the row is bound to at click time
+        row = Gtk.EventBox()
+        row.connect("button-release-event", self._on_row_clicked)
+        row.connect("enter-notify-event", self._on_row_enter)
+        stack = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        row.add(stack)
+
+        row.label = Gtk.Label()
+        row.label.get_style_context().add_class("section-label")
+        row.label.set_halign(Gtk.Align.START)
+        row.label.set_valign(Gtk.Align.END)
+        row.label.set_vexpand(True)
+        stack.pack_start(row.label, True, True, 0)
+
+        row.box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        row.box.get_style_context().add_class("entry-row")
+        stack.pack_start(row.box, True, True, 0)
+
+        # Icon: a glyph, or the thumbnail for images
+        row.glyph = Gtk.Label()
+        row.glyph.get_style_context().add_class("entry-icon")
+        row.box.pack_start(row.glyph, False, False, 4)
+        row.thumb = Gtk.Image()
+        row.thumb.get_style_context().add_class("entry-thumb")
+        row.box.pack_start(row.thumb, False, False, 4)
 
         # Text
-        display = content if is_binary else content.replace("\n", " ")[:100]
-        text = Gtk.Label(label=display)
-        text.get_style_context().add_class("entry-text")
-        if is_binary:
-            text.get_style_context().add_class("binary")
-        text.set_halign(Gtk.Align.START)
-        text.set_ellipsize(Pango.EllipsizeMode.END)
-        text.set_max_width_chars(40)
-        text.set_hexpand(True)
-        box.pack_start(text, True, True, 0)
+        row.text = Gtk.Label()
+        row.text.get_style_context().add_class("entry-text")
+        row.text.set_halign(Gtk.Align.START)
+        row.text.set_ellipsize(Pango.EllipsizeMode.END)
+        row.text.set_max_width_chars(40)
+        row.text.set_hexpand(True)
+        row.box.pack_start(row.text, True, True, 0)
 
         # Copy btn
         copy_btn = Gtk.Button(label="󰆏")
         copy_btn.get_style_context().add_class("act-copy")
         copy_btn.set_tooltip_text("Copy")
         copy_btn.set_relief(Gtk.ReliefStyle.NONE)
-        copy_btn.connect("clicked", lambda b, e=entry: self._on_copy(e))
-        box.pack_end(copy_btn, False, False, 0)
+        copy_btn.connect("clicked", lambda b: self._on_copy(row.item[0]))
+        row.box.pack_end(copy_btn, False, False, 0)
 
         # Delete btn
         del_btn = Gtk.Button(label="󰆴")
         del_btn.get_style_context().add_class("act-delete")
         del_btn.set_tooltip_text("Delete")
         del_btn.set_relief(Gtk.ReliefStyle.NONE)
-        del_btn.connect("clicked", lambda b, e=entry: self._on_delete(e))
-        box.pack_end(del_btn, False, False, 0)
+        del_btn.connect("clicked", lambda b: self._on_delete(row.item[0]))
+        row.box.pack_end(del_btn, False, False, 0)
 
         # Pin btn
-        pin_btn = Gtk.Button(label="󰤱" if is_pinned else "󰤰")
-        pin_btn.get_style_context().add_class("act-pin-active" if is_pinned else "act-pin")
-        pin_btn.set_tooltip_text("Unpin" if is_pinned else "Pin")
-        pin_btn.set_relief(Gtk.ReliefStyle.NONE)
-        pin_btn.connect("clicked", lambda b, e=entry, p=is_pinned: self._on_pin(e, p))
-        box.pack_end(pin_btn, False, False, 0)
-
-        row.add(box)
+        row.pin_btn = Gtk.Button()
+        row.pin_btn.set_relief(Gtk.ReliefStyle.NONE)
+        row.pin_btn.connect("clicked", lambda b: self._on_pin(*row.item))
+        row.box.pack_end(row.pin_btn, False, False, 0)
         return row
 
+    def _bind_row(self, row, item):
+        entry, extra = item
+        row.label.set_visible(entry is None)
+        row.box.set_visible(entry is not None)
+        if entry is None:
+            row.label.set_text(extra)
+            return
+
+        is_pinned = extra
+        set_class(row.box, "pinned", is_pinned)
+        set_class(row.box, "selected", entry["id"] in self.selected)
+
+        content = entry["content"]
+        binary = is_binary(content)
+        pixbuf = None
+        if binary and is_image(entry):
+            pixbuf = self.thumbs.peek(entry["id"])
+            if pixbuf is None:
+                # Rows are only bound on screen, so this is the lazy path
+                self.thumbs.request(
+                    entry, lambda pixbuf: self._set_thumb(row, item, pixbuf)
+                )
+        self._show_icon(row, pixbuf, "󰋩" if binary else "󰧮")
+
+        display = content if binary else content.replace("\n", " ")[:100]
+        row.text.set_text(display)
+        set_class(row.text, "binary", binary)
+
+        set_class(row.pin_btn, "act-pin-active", is_pinned)
+        set_class(row.pin_btn, "act-pin", not is_pinned)
+        row.pin_btn.set_label("󰤱" if is_pinned else "󰤰")
+        row.pin_btn.set_tooltip_text("Unpin" if is_pinned else "Pin")
+
+    def _show_icon(self, row, pixbuf, glyph):
+        if pixbuf is not None:
+            row.thumb.set_from_pixbuf(pixbuf)
+        else:
+            row.glyph.set_text(glyph)
+        row.thumb.set_visible(pixbuf is not None)
+        row.glyph.set_visible(pixbuf is None)
+
+    def _save_pins(self):
+        save_pins(self.pins)
+        save_pin_lines({pid: e["content"] for pid, e in self.pinned.items()})
+
+    def _set_thumb(self, row, item, pixbuf):
+        # The row may have been rebound to another item meanwhile
+        if pixbuf is not None and row.item is item:
+            self._show_icon(row, pixbuf, None)
+        return False
+
+    # -- preview pane ----------------------------------------------------
+
+    def _schedule_preview(self, entry):
+        # Debounced: sweeping over rows only decodes where the pointer or
+        # cursor stops
+        if entry is None or entry is self.preview_entry:
+            return
+        self.preview_entry = entry
+        if self._preview_source is not None:
+            GLib.source_remove(self._preview_source)
+        self._preview_source = GLib.timeout_add(PREVIEW_DELAY_MS, self._load_preview)
+
+    def _load_preview(self):
+        self._preview_source = None
+        entry = self.preview_entry
+        if entry is None:
+            return False
+        if is_binary(entry["content"]) and not is_image(entry):
+            self._show_preview(entry, None)
+            return False
+        preview = self.previews.get(entry["id"])
+        if preview is not None:
+            self._show_preview(entry, preview)
+            return False
+        self.preview_info.set_text("DECODING...")
+        self.preview_pane.show()
+        self.previews.request(entry, lambda p: self._show_preview(entry, p))
+        return False
+
+    def _show_preview(self, entry, preview):
+        if entry is not self.preview_entry:
+            return False
+        text = preview.get("text") if preview else None
+        pixbuf = preview.get("pixbuf") if preview else None
+        if text is not None:
+            lines, size = preview["lines"], preview["bytes"]
+            size = f"{size / 1024:.1f} KIB" if size >= 1024 else f"{size} B"
+            self.preview_info.set_text(f"{lines} LINE{'' if lines == 1 else 'S'} · {size}")
+            self.preview_text.set_text(text)
+        elif pixbuf is not None:
+            self.preview_info.set_text(entry["content"].strip("[] "))
+            self.preview_image.set_from_pixbuf(pixbuf)
+        else:
+            self.preview_info.set_text(entry["content"].strip("[] ").upper())
+        self.preview_text.set_visible(text is not None)
+        self.preview_image.set_visible(pixbuf is not None)
+        self.preview_pane.show()
+        return False
+
+    def _hide_preview(self):
+        if self._preview_source is not None:
+            GLib.source_remove(self._preview_source)
+            self._preview_source = None
+        self.preview_entry = None
+        self.previews.cancel_pending()
+        self.preview_pane.hide()
+
     def _on_copy(self, entry):
-        copy_entry(entry["raw"])
+        # Dismiss first; the transfer finishes (and reports errors) from a
+        # non-daemon thread, which also keeps a standalone process alive
         self._quit()
+        Gdk.Display.get_default().flush()
+        try:
+            procs = copy_entry(entry_line(entry))
+        except CopyError as e:
+            print(f"clipboard: copy failed: {e}", file=sys.stderr)
+            return
+        threading.Thread(target=_report_copy, args=(procs,), name="copy").start()
 
     def _on_pin(self, entry, is_pinned):
         if is_pinned:
             self.pins.remove(entry["id"])
+            self.pinned.pop(entry["id"], None)
         else:
             self.pins.append(entry["id"])
-        save_pins(self.pins)
+            self.pinned[entry["id"]] = entry
+        self._save_pins()
         self._populate_entries(self.search_entry.get_text())
 
     def _on_delete(self, entry):
-        delete_entry(entry["raw"])
-        self.entries = [e for e in self.entries if e["id"] != entry["id"]]
-        if entry["id"] in self.pins:
-            self.pins.remove(entry["id"])
-            save_pins(self.pins)
-        self._populate_entries(self.search_entry.get_text())
+        self.selected.pop(entry["id"], None)
+        self._remove_entries({entry["id"]: entry})
+        self._update_selection()
+
+    # -- multi-selection ------------------------------------------------
+
+    def _on_row_enter(self, row, event):
+        if row.item is not None:
+            self._schedule_preview(row.item[0])
+        return False
+
+    def _on_row_clicked(self, row, event):
+        if event.button != Gdk.BUTTON_PRIMARY or row.item is None:
+            return False
+        self._toggle_selected(row.item)
+        return True
+
+    def _toggle_selected(self, item):
+        # Clicking a row (or Enter on the cursor row) toggles it in the
+        # multi-selection
+        entry = item[0]
+        if entry is None:
+            return
+        if self.selected.pop(entry["id"], None) is None:
+            self.selected[entry["id"]] = entry
+        self.list_view.refresh()
+        self._update_selection()
+
+    def _select_entries(self, entries):
+        for entry in entries:
+            self.selected[entry["id"]] = entry
+        self._update_selection()
+
+    def _select_all(self):
+        """Select everything matching the search, including matches the
+        stream has not delivered yet (they are selected as they arrive)."""
+        if not self.search_entry.get_text() and self.skipped_above:
+            # Dropped entries are read again, from the top
+            self._open_stream()
+        self._select_entries(e for e, _ in self.list_view.items if e is not None)
+        self.list_view.refresh()
+        stream = self._active_stream()
+        if stream is not None and not stream.exhausted:
+            self._selecting_all = True
+            stream.want(sys.maxsize)
+
+    def _clear_selection(self):
+        self.selected = {}
+        self._selecting_all = False
+        self.list_view.refresh()
+        self._update_selection()
+
+    def _update_selection(self):
+        count = len(self.selected)
+        self.delete_sel_btn.set_label(f"DELETE {count}")
+        self.delete_sel_btn.set_visible(count > 0)
+        self.select_btn.set_label("SELECT NONE" if count else "SELECT ALL")
+
+    def _on_select_clicked(self, btn):
+        if self.selected:
+            self._clear_selection()
+        else:
+            self._select_all()
+
+    def _delete_selected(self):
+        doomed = self.selected
+        self.selected = {}
+        self._selecting_all = False
+        if doomed:
+            self._remove_entries(doomed)
+        self._update_selection()
+
+    def _remove_entries(self, doomed):
+        """Delete entries (id -> entry) with one cliphist call off the main
+        thread; items, pins and count are updated in one pass."""
+        data = "".join(entry_line(e) + "\n" for e in doomed.values()).encode()
+        self.queue.run(["delete"], data, self._on_mutation_done)
+
+        ids = set(doomed)
+        self.list_view.items[:] = [
+            item for item in self.list_view.items
+            if item[0] is None or item[0]["id"] not in ids
+        ]
+        self.list_view.changed()
+        self.entries = [e for e in self.entries if e["id"] not in ids]
+        if ids & set(self.pins):
+            self.pins = [pid for pid in self.pins if pid not in ids]
+            for pid in ids:
+                self.pinned.pop(pid, None)
+            self._save_pins()
+        if self._open_index():
+            self.index.remove(ids)
+        self.thumbs.forget(ids)
+        self.previews.forget(ids)
+        if self.preview_entry is not None and self.preview_entry["id"] in ids:
+            self._hide_preview()
+        self._update_count()
+
+    def _on_mutation_done(self, status, stdout):
+        if status == 0:
+            return
+        print(f"clipboard: cliphist exited with status {status}", file=sys.stderr)
+        # Rows are already gone; re-read so the list matches cliphist again
+        if self.get_visible():
+            self._open_stream()
+
+    def _on_busy(self, busy):
+        self.spinner.set_visible(busy)
+        if busy:
+            self.spinner.start()
+        else:
+            self.spinner.stop()
 
     def _on_clear_all(self, btn):
-        subprocess.run(["cliphist", "wipe"])
+        self._close_streams()
+        self.queue.run(["wipe"], None, self._on_mutation_done)
+        if self._open_index():
+            self.index.clear()
+        self.thumbs.clear()
+        self.previews.clear()
+        self._clear_selection()
         self.entries = []
+        self.skipped_above = 0
         self.pins = []
-        save_pins(self.pins)
+        self.pinned = {}
+        self._save_pins()
+        self._update_count()
         self._populate_entries()
 
     def _on_search_changed(self, entry):
-        self._populate_entries(entry.get_text())
+        self._cancel_search()
+        if entry.get_text() and not self.index_fresh and not self._history_loaded():
+            # This search re-lists the whole history: wait for typing to pause
+            self._search_source = GLib.timeout_add(SEARCH_DELAY_MS, self._run_search)
+            return
+        self._run_search()
+
+    def _run_search(self):
+        self._search_source = None
+        t = time.monotonic()
+        self._populate_entries(self.search_entry.get_text())
+        self.profiler.sample("keystroke_ms", (time.monotonic() - t) * 1000)
+        return False
+
+    def _cancel_search(self):
+        if self._search_source is not None:
+            GLib.source_remove(self._search_source)
+            self._search_source = None
 
     def _on_key(self, widget, event):
+        mods = event.state & Gtk.accelerator_get_default_mod_mask()
+        ctrl_shift = Gdk.ModifierType.CONTROL_MASK | Gdk.ModifierType.SHIFT_MASK
         if event.keyval == Gdk.KEY_Escape:
-            self._quit()
+            if self.selected:
+                self._clear_selection()
+            else:
+                self._quit()
+            return True
+        if mods == ctrl_shift and event.keyval in (Gdk.KEY_a, Gdk.KEY_A):
+            self._select_all()
+            return True
+        if mods == Gdk.ModifierType.SHIFT_MASK and event.keyval == Gdk.KEY_Delete:
+            self._delete_selected()
             return True
         return False
 
+    def popup(self):
+        # History changes while hidden, so a resident window re-reads it
+        self.profiler.restart(self)
+        self._load_pins()
+        self._clear_selection()
+        self.search_entry.set_text("")
+        self._open_stream()
+        self.watcher.start()
+        self.show_all()
+        self.present()
+
     def _quit(self):
+        self._cancel_search()
+        self.watcher.stop()
+        self._hide_preview()
+        self._close_streams()
+        self.thumbs.flush()
+        if self.resident:
+            self.hide()
+            self.profiler.flush(resident=True)
+            return
+        if self.closing:
+            return
+        self.closing = True
+        self.profiler.flush()
         try:
             os.remove(PID_FILE)
         except FileNotFoundError:
             pass
+        # Reads were just cancelled; let queued deletes/wipes land first
+        self.hide()
+        self.queue.when_idle(self._exit)
+
+    def _exit(self):
         self.destroy()
         Gtk.main_quit()
 
 
 def main():
+    profiler = Profiler("clipboard", start=STARTED)
+    profiler.record("imports", STARTED, IMPORTED)
     if os.path.exists(PID_FILE):
         try:
             old_pid = int(open(PID_FILE).read().strip())
@@ -292,15 +996,11 @@ def main():
         f.write(str(os.getpid()))
 
     def on_sigterm(*args):
-        try:
-            os.remove(PID_FILE)
-        except FileNotFoundError:
-            pass
-        Gtk.main_quit()
+        win._quit()
 
     signal.signal(signal.SIGTERM, on_sigterm)
 
-    win = ClipboardManager()
+    win = ClipboardManager(profiler)
     win.show_all()
     Gtk.main()
 
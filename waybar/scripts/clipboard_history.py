@@ -0,0 +1,308 @@
+"""Tech HUD — streaming access to the cliphist history"""
+
+import collections
+import os
+import subprocess
+
+from gi.repository import Gio, GLib
+
+from clipboard_list import LOOKAHEAD, PAGE_SIZE, parse_line
+
+# Bytes per read from `cliphist list`
+READ_CHUNK = 16384
+# cliphist's default -preview-width; longer previews are truncated
+PREVIEW_WIDTH = 100
+# cliphist's database (its -db-path flag is also read from CLIPHIST_DB_PATH)
+CLIPHIST_DB = os.environ.get("CLIPHIST_DB_PATH") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cliphist", "db"
+)
+# A store is several writes; wait this long after the last before relisting
+WATCH_DELAY_MS = 150
+
+
+class CliphistQueue:
+    """Runs cliphist commands one at a time, in order, from the main loop.
+
+    A delete queued before a list is always finished before that list
+    starts, so a reload can never see rows the user already removed.
+    Commands run as Gio.Subprocess with communicate_async, so a slow
+    database never blocks the window. on_busy(bool) follows the pending
+    state.
+    """
+
+    def __init__(self, on_busy=None):
+        self.on_busy = on_busy
+        self.jobs = collections.deque()
+        self.current = None
+        self._idle_callbacks = []
+
+    @property
+    def busy(self):
+        return self.current is not None or bool(self.jobs)
+
+    def call(self, start):
+        """Queue start(done); the job owns the queue until done() is called."""
+        job = [start]
+        self.jobs.append(job)
+        if self.current is None:
+            self._next()
+        elif self.on_busy:
+            self.on_busy(True)
+        return job
+
+    def run(self, args, data=None, on_done=None):
+        """Queue `cliphist ARGS` with data on stdin; on_done(status, stdout)."""
+
+        def start(done):
+            flags = Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE
+            if data is not None:
+                flags |= Gio.SubprocessFlags.STDIN_PIPE
+            try:
+                proc = Gio.Subprocess.new(["cliphist", *args], flags)
+            except GLib.Error:
+                finish(None, None, done)
+                return
+            stdin = GLib.Bytes.new(data) if data is not None else None
+            proc.communicate_async(stdin, None, finish, done)
+
+        def finish(proc, result, done):
+            status, stdout = 127, b""
+            if proc is not None:
+                try:
+                    _, out, _ = proc.communicate_finish(result)
+                    stdout = out.get_data() if out else b""
+                    status = proc.get_exit_status() if proc.get_if_exited() else -1
+                except GLib.Error:
+                    status = -1
+            done()
+            if on_done:
+                on_done(status, stdout)
+
+        return self.call(start)
+
+    def cancel(self, job):
+        """Drop a job that has not started yet."""
+        try:
+            self.jobs.remove(job)
+        except ValueError:
+            return
+        if self.current is None:
+            self._next()
+
+    def when_idle(self, callback):
+        if self.busy:
+            self._idle_callbacks.append(callback)
+        else:
+            callback()
+
+    def _next(self):
+        if not self.jobs:
+            self.current = None
+            if self.on_busy:
+                self.on_busy(False)
+            callbacks, self._idle_callbacks = self._idle_callbacks, []
+            for callback in callbacks:
+                callback()
+            return
+        job = self.current = self.jobs.popleft()
+        if self.on_busy:
+            self.on_busy(True)
+
+        def done():
+            if self.current is job:
+                GLib.idle_add(self._advance)
+
+        job[0](done)
+
+    def _advance(self):
+        self.current = None
+        self._next()
+        return False
+
+
+class HistoryStream:
+    """`cliphist list` read a page at a time through a CliphistQueue.
+
+    Entries accepted by `match` go to on_entries in batches until `wanted`
+    have been delivered. cliphist is then stopped, so it never holds the
+    database while the popup sits open, and want() resumes with a fresh
+    list that skips to below the last delivered ID (the list is newest
+    first). Memory follows what has been shown, not the history size.
+
+    With `after`, only entries newer than that ID are read: the list is
+    stopped at the first one already known, which is usually the second
+    line. With `before`, reading starts below that ID. A stream that wants
+    nothing yet starts paused.
+    """
+
+    def __init__(self, queue, on_entries, on_done=None, match=None,
+                 wanted=PAGE_SIZE + LOOKAHEAD, after=None, before=None):
+        self.queue = queue
+        self.on_entries = on_entries
+        self.on_done = on_done
+        self.match = match
+        self.wanted = wanted
+        self.after = after
+        self.delivered = 0
+        self.exhausted = False
+        self.caught_up = False
+        self.last_id = before
+        self.proc = None
+        self._job = None
+        self._done = None
+        self._pending = collections.deque()
+        self._tail = b""
+        self._watch = None
+        if wanted > 0:
+            self._job = self.queue.call(self._start_page)
+
+    @property
+    def paused(self):
+        return self._job is None
+
+    def want(self, count):
+        """Read on until `count` matching entries have been delivered."""
+        if count <= self.wanted or self.exhausted:
+            return
+        self.wanted = count
+        if self._job is None:
+            self._job = self.queue.call(self._start_page)
+
+    def _start_page(self, done):
+        self._done = done
+        try:
+            self.proc = subprocess.Popen(
+                ["cliphist", "list"], stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            self._end_page(eof=True)
+            return
+        os.set_blocking(self.proc.stdout.fileno(), False)
+        self._watch = GLib.io_add_watch(
+            self.proc.stdout.fileno(), GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR, self._on_readable,
+        )
+
+    def _on_readable(self, fd, condition):
+        try:
+            chunk = os.read(fd, READ_CHUNK)
+        except BlockingIOError:
+            return True
+        except OSError:
+            chunk = b""
+        eof = not chunk
+        if chunk:
+            lines = (self._tail + chunk).split(b"\n")
+            self._tail = lines.pop()
+            self._pending.extend(lines)
+        elif self._tail:
+            self._pending.append(self._tail)
+            self._tail = b""
+        self._drain()
+        if self._watch is None:
+            return False
+        if eof or self.caught_up or self.delivered >= self.wanted:
+            self._watch = None
+            self._end_page((eof and not self._pending) or self.caught_up)
+            return False
+        return True
+
+    def _drain(self):
+        batch = []
+        while self._pending and self.delivered + len(batch) < self.wanted:
+            line = self._pending.popleft().decode("utf-8", "replace")
+            entry = parse_line(line)
+            if entry is None or not entry["id"].isdigit():
+                continue
+            entry_id = int(entry["id"])
+            if self.after is not None and entry_id <= self.after:
+                self._pending.clear()
+                self.caught_up = True
+                break
+            if self.last_id is not None and entry_id >= self.last_id:
+                continue
+            self.last_id = entry_id
+            if self.match is None or self.match(entry):
+                batch.append(entry)
+        self.delivered += len(batch)
+        if batch:
+            self.on_entries(batch)
+
+    def _stop_proc(self):
+        if self._watch is not None:
+            GLib.source_remove(self._watch)
+            self._watch = None
+        self._pending.clear()
+        self._tail = b""
+        if self.proc is not None:
+            self.proc.stdout.close()
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+    def _end_page(self, eof):
+        self._stop_proc()
+        done, self._done = self._done, None
+        self._job = None
+        if done:
+            done()
+        if eof and not self.exhausted:
+            self.exhausted = True
+            if self.on_done:
+                self.on_done()
+
+    def close(self):
+        """Stop reading; a queued page is dropped (safe to call repeatedly)."""
+        if self._job is not None and self._done is None:
+            self.queue.cancel(self._job)
+        self._stop_proc()
+        done, self._done = self._done, None
+        self._job = None
+        if done:
+            done()
+
+
+class HistoryWatcher:
+    """Calls on_change() once cliphist's database settles after a write.
+
+    Watching the database (rather than running a second `wl-paste --watch`)
+    means the callback only fires once the entry is actually stored, by
+    whichever watcher stored it.
+    """
+
+    def __init__(self, on_change, path=CLIPHIST_DB):
+        self.on_change = on_change
+        self.path = path
+        self.monitor = None
+        self._source = None
+
+    def start(self):
+        if self.monitor is not None:
+            return
+        try:
+            self.monitor = Gio.File.new_for_path(self.path).monitor_file(
+                Gio.FileMonitorFlags.NONE, None
+            )
+        except GLib.Error:
+            return
+        self.monitor.connect("changed", self._on_changed)
+
+    def _on_changed(self, monitor, file, other, event):
+        if self._source is not None:
+            GLib.source_remove(self._source)
+        self._source = GLib.timeout_add(WATCH_DELAY_MS, self._fire)
+
+    def _fire(self):
+        self._source = None
+        self.on_change()
+        return False
+
+    def stop(self):
+        if self.monitor is not None:
+            self.monitor.cancel()
+            self.monitor = None
+        if self._source is not None:
+            GLib.source_remove(self._source)
+            self._source = None
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Tech HUD — full-text index of the cliphist history (SQLite FTS5)
+
+cliphist only keeps a one-line preview per entry in `cliphist list`. This
+index holds the full decoded text of each text entry (the preview line for
+binary ones), keyed by cliphist ID, so clipboard-ui.py can run ranked,
+prefix-aware searches without scanning the history.
+
+Use it in place of `cliphist store` in the wl-paste watchers; it stores the
+entry, applies clipboard_retention.py's dedup and caps if any cap is
+configured, and indexes it (`sync` prunes entries cliphist has dropped
+since):
+
+    wl-paste --type text --watch clipboard_index.py store
+    wl-paste --type image --watch clipboard_index.py store
+
+    clipboard_index.py sync      # backfill existing history, prune
+    clipboard_index.py search QUERY
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from clipboard_list import decode, is_binary, list_history, store
+from clipboard_retention import after_store, configured
+
+INDEX_DB = os.path.expanduser("~/.cache/clipboard-index.sqlite")
+INDEX_VERSION = 1
+# Text beyond this is not indexed (keeps the database small)
+MAX_TEXT = 64 * 1024
+SYNC_BATCH = 200
+# Concurrent `cliphist decode` processes while backfilling
+SYNC_WORKERS = 4
+
+
+def fts_query(text):
+    """Each word as a quoted prefix term, all required."""
+    terms = ['"' + t.replace('"', '""') + '"*' for t in text.split()]
+    return " ".join(terms)
+
+
+def decode_text(entry_id, preview):
+    data = decode(entry_id, preview)
+    if data is None:
+        return None
+    try:
+        return data[:MAX_TEXT].decode("utf-8")
+    except UnicodeDecodeError:
+        return data[:MAX_TEXT].decode("utf-8", "ignore")
+
+
+class ClipIndex:
+    def __init__(self, path=INDEX_DB):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=5)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS clips")
+            self.db.execute(
+                "CREATE VIRTUAL TABLE clips USING fts5("
+                "body, preview UNINDEXED, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            self.db.execute(f"PRAGMA user_version={INDEX_VERSION}")
+            self.db.commit()
+
+    @classmethod
+    def open_existing(cls, path=INDEX_DB):
+        """The index if the indexer has created one, else None."""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error:
+            return None
+
+    def max_id(self):
+        # ORDER BY/LIMIT stops at the first row; max() would scan them all
+        try:
+            row = self.db.execute(
+                "SELECT rowid FROM clips ORDER BY rowid DESC LIMIT 1"
+            ).fetchone()
+        except sqlite3.Error:
+            return 0
+        return row[0] if row else 0
+
+    def ids(self):
+        return {row[0] for row in self.db.execute("SELECT rowid FROM clips")}
+
+    def add(self, entry_id, preview, text=None):
+        body = preview if text is None else text[:MAX_TEXT]
+        self.db.execute("DELETE FROM clips WHERE rowid = ?", (entry_id,))
+        self.db.execute(
+            "INSERT INTO clips (rowid, body, preview) VALUES (?, ?, ?)",
+            (entry_id, body, preview),
+        )
+
+    # Removal failures are left for the next store or sync to prune
+    def remove(self, entry_ids):
+        try:
+            self.db.executemany(
+                "DELETE FROM clips WHERE rowid = ?", [(int(i),) for i in entry_ids]
+            )
+            self.db.commit()
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        try:
+            self.db.execute("DELETE FROM clips")
+            self.db.commit()
+        except sqlite3.Error:
+            pass
+
+    def prune(self, history):
+        """Drop indexed entries no longer in cliphist; returns the count."""
+        stale = self.ids() - {entry_id for entry_id, _ in history}
+        if stale:
+            self.remove(stale)
+        return len(stale)
+
+    def search(self, text, limit=100, offset=0):
+        """Best match first (bm25, then newest) as clipboard entries."""
+        query = fts_query(text)
+        if not query:
+            return []
+        try:
+            rows = self.db.execute(
+                "SELECT rowid, preview FROM clips WHERE clips MATCH ? "
+                "ORDER BY rank, rowid DESC LIMIT ? OFFSET ?",
+                (query, limit, offset),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [{"id": str(entry_id), "content": preview} for entry_id, preview in rows]
+
+    def close(self):
+        self.db.close()
+
+
+class SearchResults:
+    """Index matches paged through the same want()/close() protocol as
+    clipboard_history.HistoryStream, delivered synchronously."""
+
+    paused = True
+
+    def __init__(self, index, text, on_entries, on_done=None, wanted=100):
+        self.index = index
+        self.text = text
+        self.on_entries = on_entries
+        self.on_done = on_done
+        self.wanted = 0
+        self.delivered = 0
+        self.exhausted = False
+        self.want(wanted)
+
+    def want(self, count):
+        if count <= self.wanted or self.exhausted:
+            return
+        self.wanted = count
+        rows = self.index.search(self.text, count - self.delivered, self.delivered)
+        self.delivered += len(rows)
+        if rows:
+            self.on_entries(rows)
+        if self.delivered < count:
+            self.exhausted = True
+            if self.on_done:
+                self.on_done()
+
+    def close(self):
+        pass
+
+
+def add_stored(index, entry, data):
+    """Index (id, preview) that cliphist just stored from `data`: its text,
+    or the preview line for binary data."""
+    entry_id, preview = entry
+    text = None
+    if not is_binary(preview):
+        text = data[:MAX_TEXT].decode("utf-8", "ignore")
+    index.add(entry_id, preview, text)
+    index.db.commit()
+
+
+def cmd_store(path):
+    data = sys.stdin.buffer.read()
+    status, newest = store(data)
+    if newest is None:
+        return status
+    if configured() and newest[0] in after_store(newest[0], data, list_history()):
+        return 0
+    try:
+        index = ClipIndex(path)
+    except sqlite3.Error as e:
+        print(f"clipboard_index: {e}", file=sys.stderr)
+        return 0
+    try:
+        add_stored(index, newest, data)
+    except sqlite3.Error as e:
+        print(f"clipboard_index: {e}", file=sys.stderr)
+    finally:
+        index.close()
+    return 0
+
+
+def cmd_sync(index):
+    history = list_history()
+    pruned = index.prune(history)
+    known = index.ids()
+    missing = [(i, p) for i, p in history if i not in known]
+
+    def fetch(item):
+        entry_id, preview = item
+        return None if is_binary(preview) else decode_text(entry_id, preview)
+
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+        for n, ((entry_id, preview), text) in enumerate(
+            zip(missing, pool.map(fetch, missing)), 1
+        ):
+            index.add(entry_id, preview, text)
+            if n % SYNC_BATCH == 0:
+                index.db.commit()
+    index.db.commit()
+    print(f"indexed {len(missing)}, pruned {pruned}, total {len(history)}")
+    return 0
+
+
+def cmd_search(index, text):
+    for entry in index.search(text, limit=20):
+        print(f"{entry['id']}\t{entry['content']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text index of cliphist history")
+    parser.add_argument("--db", default=INDEX_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("store", help="cliphist store from stdin, then index it")
+    sub.add_parser("sync", help="index missing entries and prune deleted ones")
+    search = sub.add_parser("search", help="print the best matches")
+    search.add_argument("query", nargs="+")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db), exist_ok=True)
+    if args.command == "store":
+        return cmd_store(args.db)
+    index = ClipIndex(args.db)
+    try:
+        if args.command == "sync":
+            return cmd_sync(index)
+        return cmd_search(index, " ".join(args.query))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Tech HUD — cliphist entries, and the cliphist calls on them (GTK-free)"""
+
+import os
+import subprocess
+
+PAGE_SIZE = 60
+LOOKAHEAD_DEFAULT = 120
+# wl-paste sets CLIPBOARD_STATE; cliphist stores nothing for these, and
+# "clear" deletes the newest entry instead
+UNSTORED_STATES = ("sensitive", "clear")
+
+
+def lookahead(value):
+    """HUD_CLIPBOARD_LOOKAHEAD in rows; the default when it is not a whole
+    number, and never negative."""
+    try:
+        rows = int(value)
+    except (TypeError, ValueError):
+        return LOOKAHEAD_DEFAULT
+    return max(rows, 0)
+
+
+# Rows wanted before the first scroll (PAGE_SIZE), and how many rows past
+# the bottom of the viewport are read ahead
+LOOKAHEAD = lookahead(os.environ.get("HUD_CLIPBOARD_LOOKAHEAD"))
+
+
+def parse_line(line):
+    tab = line.find("\t")
+    if tab == -1:
+        return None
+    return {"id": line[:tab], "content": line[tab + 1 :]}
+
+
+def entry_line(entry):
+    """The `cliphist list` line that decode/delete expect for an entry."""
+    return f"{entry['id']}\t{entry['content']}"
+
+
+def is_binary(preview):
+    return preview.startswith("[[ binary data")
+
+
+def iter_entries():
+    """Blocking generator over the history, newest first."""
+    proc = subprocess.Popen(
+        ["cliphist", "list"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        for line in proc.stdout:
+            entry = parse_line(line.rstrip(b"\n").decode("utf-8", "replace"))
+            if entry:
+                yield entry
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def list_history():
+    """[(id, preview)] from `cliphist list`, newest first."""
+    return [(int(e["id"]), e["content"]) for e in iter_entries() if e["id"].isdigit()]
+
+
+def newest_entry():
+    """(id, preview) of the newest entry, or None; cliphist is stopped
+    after the first line."""
+    entries = iter_entries()
+    try:
+        entry = next(entries, None)
+    finally:
+        entries.close()
+    if entry is None or not entry["id"].isdigit():
+        return None
+    return int(entry["id"]), entry["content"]
+
+
+def decode(entry_id, preview):
+    """The stored bytes of an entry, or None."""
+    result = subprocess.run(
+        ["cliphist", "decode"], input=f"{entry_id}\t{preview}".encode(),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    return result.stdout if result.returncode == 0 else None
+
+
+def store(data):
+    """`cliphist store` data. Returns (exit status, (id, preview) of the
+    entry it made, or None when cliphist stored nothing new).
+
+    Callers record or index the entry only after this: a broken cache of
+    theirs must never cost a clipboard entry."""
+    stored = os.environ.get("CLIPBOARD_STATE") not in UNSTORED_STATES and bool(data.strip())
+    before = newest_entry() if stored else None
+    result = subprocess.run(["cliphist", "store"], input=data)
+    if result.returncode != 0 or not stored:
+        return result.returncode, None
+    # Only an entry newer than the one before is this copy: anything else
+    # means cliphist dropped it, and recording or indexing it would
+    # overwrite that older entry
+    newest = newest_entry()
+    if newest is None or (before is not None and newest[0] <= before[0]):
+        return 0, None
+    return 0, newest
@@ -0,0 +1,110 @@
+"""Tech HUD — decoded full-content previews of clipboard entries"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GLib
+
+from clipboard_list import decode
+from clipboard_thumbs import is_image, scaled_pixbuf
+
+# Decoded previews kept in memory, by their size (text bytes or pixels)
+PREVIEW_CACHE_BYTES = 32 * 1024 * 1024
+# Longer text is cut for display (the line count is still of the whole)
+PREVIEW_TEXT_MAX = 64 * 1024
+PREVIEW_WIDTH, PREVIEW_HEIGHT = 520, 200
+
+
+def _decode(entry):
+    """Worker: {"text", "lines", "size"} or {"pixbuf", "size"}, or None."""
+    data = decode(entry["id"], entry["content"])
+    if data is None:
+        return None
+    if is_image(entry):
+        pixbuf = scaled_pixbuf(data, PREVIEW_WIDTH, PREVIEW_HEIGHT)
+        if pixbuf is None:
+            return None
+        return {"pixbuf": pixbuf, "size": pixbuf.get_rowstride() * pixbuf.get_height()}
+    text = data.decode("utf-8", "replace")
+    lines = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+    shown = text[:PREVIEW_TEXT_MAX]
+    return {"text": shown, "lines": lines, "bytes": len(data), "size": len(shown)}
+
+
+class PreviewCache:
+    """Previews decoded in a worker thread into a byte-bounded LRU.
+
+    Only the latest request matters while the user moves through the
+    list, so a new request drops queued ones; callbacks run on the main
+    loop, always later.
+    """
+
+    def __init__(self, max_bytes=PREVIEW_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.bytes = 0
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        # id -> [future, callbacks]
+        self.pending = {}
+
+    def get(self, entry_id):
+        preview = self.memory.get(entry_id)
+        if preview is not None:
+            self.memory.move_to_end(entry_id)
+        return preview
+
+    def request(self, entry, callback):
+        """Call callback(preview or None) from the main loop."""
+        entry_id = entry["id"]
+        if entry_id in self.memory:
+            GLib.idle_add(callback, self.get(entry_id))
+            return
+        self.cancel_pending()
+        if entry_id in self.pending:
+            self.pending[entry_id][1].append(callback)
+            return
+        future = self.pool.submit(_decode, entry)
+        self.pending[entry_id] = [future, [callback]]
+        future.add_done_callback(lambda f: GLib.idle_add(self._finish, entry_id, f))
+
+    def _finish(self, entry_id, future):
+        if future.cancelled():
+            return False
+        callbacks = []
+        if self.pending.get(entry_id, [None])[0] is future:
+            callbacks = self.pending.pop(entry_id)[1]
+        try:
+            preview = future.result()
+        except Exception:
+            preview = None
+        if preview is not None and preview["size"] <= self.max_bytes:
+            self._store(entry_id, preview)
+        for callback in callbacks:
+            callback(preview)
+        return False
+
+    def _store(self, entry_id, preview):
+        old = self.memory.pop(entry_id, None)
+        if old is not None:
+            self.bytes -= old["size"]
+        self.memory[entry_id] = preview
+        self.bytes += preview["size"]
+        while self.bytes > self.max_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.bytes -= evicted["size"]
+
+    def forget(self, entry_ids):
+        for entry_id in entry_ids:
+            preview = self.memory.pop(entry_id, None)
+            if preview is not None:
+                self.bytes -= preview["size"]
+
+    def clear(self):
+        self.cancel_pending()
+        self.memory.clear()
+        self.bytes = 0
+
+    def cancel_pending(self):
+        for entry_id, (future, _) in list(self.pending.items()):
+            if future.cancel():
+                del self.pending[entry_id]
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Tech HUD — deduplication and size/age-capped retention for cliphist
+
+cliphist keeps every copy until its item limit, so identical copies pile
+up and large images accumulate. This keeps a small ledger of each entry's
+content hash, size and store time, keyed by cliphist ID, and after every
+store deletes:
+
+  - older copies of content that is stored again (the newest one stays)
+  - entries past the count, total size or age caps, oldest first
+
+Copying an entry from the clipboard manager stores it again, so "oldest"
+is least recently used. Entries pinned in the clipboard manager are never
+deleted and do not count towards the caps.
+
+Use it in place of `cliphist store` in the wl-paste watchers:
+
+    wl-paste --type image --watch clipboard_retention.py store
+
+    clipboard_retention.py sync             # record existing history, enforce
+    clipboard_retention.py sync --dry-run   # report what would be reclaimed
+
+Caps come from HUD_CLIPBOARD_MAX_ITEMS, HUD_CLIPBOARD_MAX_BYTES (e.g.
+256M) and HUD_CLIPBOARD_MAX_AGE_DAYS, or the matching flags; all are off
+(0) unless set. clipboard_index.py store applies the same retention once
+one of the variables sets a cap; stores through this hook also keep an
+existing clipboard_index.py index current.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from clipboard_list import decode, list_history, store
+
+LEDGER_DB = os.path.expanduser("~/.cache/clipboard-retention.sqlite")
+LEDGER_VERSION = 1
+PINS_FILE = os.path.expanduser("~/.cache/clipboard-pins.json")
+MAX_ITEMS = os.environ.get("HUD_CLIPBOARD_MAX_ITEMS", "0")
+MAX_BYTES = os.environ.get("HUD_CLIPBOARD_MAX_BYTES", "0")
+MAX_AGE_DAYS = os.environ.get("HUD_CLIPBOARD_MAX_AGE_DAYS", "0")
+# Concurrent `cliphist decode` processes while recording existing history
+SYNC_WORKERS = 4
+SYNC_BATCH = 200
+
+UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text):
+    """'512M' -> bytes (K/M/G are binary units, a trailing B is optional)."""
+    text = text.strip().upper().removesuffix("B").removesuffix("I")
+    unit = text[-1:] if text[-1:] in UNITS else ""
+    return int(float(text[: len(text) - len(unit)]) * UNITS[unit])
+
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class Caps:
+    def __init__(self, max_items=MAX_ITEMS, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS):
+        self.max_items = int(max_items)
+        self.max_bytes = parse_size(str(max_bytes))
+        self.max_age = float(max_age_days) * 86400
+
+    @property
+    def active(self):
+        return bool(self.max_items or self.max_bytes or self.max_age)
+
+
+def configured():
+    """True when the environment sets at least one valid cap."""
+    try:
+        return Caps().active
+    except ValueError:
+        return False
+
+
+def load_pins():
+    """Pinned cliphist IDs (the clipboard manager stores them as strings)."""
+    try:
+        with open(PINS_FILE, "r") as f:
+            return {int(pid) for pid in json.load(f) if str(pid).isdigit()}
+    except (OSError, json.JSONDecodeError, TypeError):
+        return set()
+
+
+class Ledger:
+    """entry ID -> (content hash, size, store time)."""
+
+    def __init__(self, path=LEDGER_DB):
+        self.db = sqlite3.connect(path, timeout=5)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != LEDGER_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS entries")
+            self.db.execute(
+                "CREATE TABLE entries ("
+                "id INTEGER PRIMARY KEY, hash TEXT NOT NULL, "
+                "size INTEGER NOT NULL, stored REAL NOT NULL)"
+            )
+            self.db.execute(f"PRAGMA user_version={LEDGER_VERSION}")
+            self.db.commit()
+
+    def record(self, entry_id, data, stored=None):
+        # An ID is only ever recorded once: if cliphist skipped a store,
+        # the newest entry keeps its original hash and time
+        self.db.execute(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+            (entry_id, hashlib.sha1(data).hexdigest(), len(data), stored or time.time()),
+        )
+
+    def rows(self):
+        return {
+            row[0]: row[1:]
+            for row in self.db.execute("SELECT id, hash, size, stored FROM entries")
+        }
+
+    def forget(self, entry_ids):
+        self.db.executemany(
+            "DELETE FROM entries WHERE id = ?", [(int(i),) for i in entry_ids]
+        )
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def plan(history, rows, pins, caps, now=None):
+    """[(id, preview, reason, size)] to delete, oldest last.
+
+    `history` is newest first, as `cliphist list` prints it. Entries the
+    ledger has not seen count as empty and new, so only the count cap and
+    pins apply to them until `sync` records them.
+    """
+    now = now or time.time()
+    doomed = []
+    hashes = set()
+    kept = kept_bytes = 0
+    cutoff = None
+    for entry_id, preview in history:
+        digest, size, stored = rows.get(entry_id, (None, 0, now))
+        if entry_id in pins:
+            # A pinned copy still makes older duplicates redundant
+            hashes.add(digest)
+            continue
+        if digest is not None and digest in hashes:
+            doomed.append((entry_id, preview, "duplicate", size))
+            continue
+        hashes.add(digest)
+        # The newest entry is on the clipboard right now and always stays;
+        # past the first cap that is hit, every older entry goes
+        if kept and cutoff is None:
+            if caps.max_items and kept >= caps.max_items:
+                cutoff = "count"
+            elif caps.max_bytes and kept_bytes + size > caps.max_bytes:
+                cutoff = "bytes"
+        if cutoff is not None:
+            doomed.append((entry_id, preview, cutoff, size))
+            continue
+        if kept and caps.max_age and now - stored > caps.max_age:
+            doomed.append((entry_id, preview, "age", size))
+            continue
+        kept += 1
+        kept_bytes += size
+    return doomed
+
+
+def delete(doomed):
+    """One `cliphist delete` for all doomed entries; True on success."""
+    data = "".join(f"{entry_id}\t{preview}\n" for entry_id, preview, _, _ in doomed)
+    result = subprocess.run(["cliphist", "delete"], input=data.encode())
+    return result.returncode == 0
+
+
+def enforce(ledger, history, caps=None, dry_run=False):
+    """Delete what plan() picks and drop gone entries from the ledger
+    and, if there is one, the search index."""
+    doomed = plan(history, ledger.rows(), load_pins(), caps or Caps())
+    if dry_run:
+        return doomed
+    if doomed and not delete(doomed):
+        return []
+    if doomed:
+        # Imported here: clipboard_index imports this module
+        from clipboard_index import ClipIndex
+        index = ClipIndex.open_existing()
+        if index is not None:
+            index.remove(d[0] for d in doomed)
+            index.close()
+    live = {entry_id for entry_id, _ in history} - {d[0] for d in doomed}
+    ledger.forget(set(ledger.rows()) - live)
+    ledger.commit()
+    return doomed
+
+
+def after_store(entry_id, data, history, path=LEDGER_DB, caps=None):
+    """Record `data` as the entry just stored and enforce; returns the
+    deleted IDs. The caller checks that cliphist did store it as
+    `entry_id`. Errors are reported, never raised: the copy is stored."""
+    try:
+        ledger = Ledger(path)
+    except sqlite3.Error as e:
+        print(f"clipboard_retention: {e}", file=sys.stderr)
+        return set()
+    try:
+        ledger.record(entry_id, data)
+        return {d[0] for d in enforce(ledger, history, caps)}
+    except sqlite3.Error as e:
+        print(f"clipboard_retention: {e}", file=sys.stderr)
+        return set()
+    finally:
+        ledger.close()
+
+
+def cmd_store(path, caps):
+    data = sys.stdin.buffer.read()
+    status, newest = store(data)
+    if newest is None or newest[0] in after_store(newest[0], data, list_history(), path, caps):
+        return status
+    # Keep an existing index current, or clipboard-ui stops trusting it
+    from clipboard_index import ClipIndex, add_stored
+    index = ClipIndex.open_existing()
+    if index is not None:
+        try:
+            add_stored(index, newest, data)
+        except sqlite3.Error as e:
+            print(f"clipboard_retention: {e}", file=sys.stderr)
+        finally:
+            index.close()
+    return status
+
+
+def cmd_sync(ledger, caps, dry_run, verbose):
+    history = list_history()
+    known = ledger.rows()
+    missing = [(i, p) for i, p in history if i not in known]
+    # Store times of existing entries are unknown: their age starts now
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+        for n, ((entry_id, _), data) in enumerate(
+            zip(missing, pool.map(lambda item: decode(*item), missing)), 1
+        ):
+            if data is not None:
+                ledger.record(entry_id, data)
+            if n % SYNC_BATCH == 0:
+                ledger.commit()
+    ledger.commit()
+
+    doomed = enforce(ledger, history, caps, dry_run)
+    verb = "would delete" if dry_run else "deleted"
+    total = sum(d[3] for d in doomed)
+    print(f"{verb} {len(doomed)} of {len(history)} entries, {format_size(total)}")
+    for reason in ("duplicate", "count", "bytes", "age"):
+        hits = [d for d in doomed if d[2] == reason]
+        if hits:
+            size = format_size(sum(d[3] for d in hits))
+            print(f"  {reason:<10} {len(hits):>6}  {size}")
+    if verbose:
+        for entry_id, preview, reason, size in doomed:
+            print(f"{entry_id}\t{reason}\t{format_size(size)}\t{preview[:60]}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate and cap cliphist history")
+    parser.add_argument("--db", default=LEDGER_DB)
+    parser.add_argument("--max-items", default=MAX_ITEMS)
+    parser.add_argument("--max-bytes", default=MAX_BYTES)
+    parser.add_argument("--max-age-days", default=MAX_AGE_DAYS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("store", help="cliphist store from stdin, then enforce")
+    sync = sub.add_parser("sync", help="record existing entries, then enforce")
+    sync.add_argument("--dry-run", action="store_true", help="only report")
+    sync.add_argument("-v", "--verbose", action="store_true", help="list entries")
+    args = parser.parse_args()
+
+    try:
+        caps = Caps(args.max_items, args.max_bytes, args.max_age_days)
+    except ValueError as e:
+        parser.error(f"bad cap: {e}")
+    os.makedirs(os.path.dirname(args.db), exist_ok=True)
+    if args.command == "store":
+        return cmd_store(args.db, caps)
+    ledger = Ledger(args.db)
+    try:
+        return cmd_sync(ledger, caps, args.dry_run, args.verbose)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Tech HUD — cached image thumbnails for binary clipboard entries"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GdkPixbuf, GLib
+
+from clipboard_list import decode
+
+THUMB_DIR = os.path.expanduser("~/.cache/clipboard-thumbs")
+# id -> [preview line, content hash]; thumbnails are <hash>.png
+THUMB_INDEX = os.path.join(THUMB_DIR, "index.json")
+THUMB_WIDTH, THUMB_HEIGHT = 64, 32
+# Disk cap; least recently shown thumbnails are evicted first
+THUMB_CACHE_MAX = 32 * 1024 * 1024
+THUMB_MEMORY = 256
+THUMB_WORKERS = 3
+SAVE_DELAY_MS = 500
+
+IMAGE_PREVIEW_RE = re.compile(r"^\[\[ binary data .* \w+ \d+x\d+ \]\]$")
+
+
+def is_image(entry):
+    return bool(IMAGE_PREVIEW_RE.match(entry["content"]))
+
+
+def scaled_pixbuf(data, max_width=THUMB_WIDTH, max_height=THUMB_HEIGHT):
+    """Decode image bytes straight to a size that fits (no full-size copy)."""
+    loader = GdkPixbuf.PixbufLoader()
+
+    def on_size(loader, width, height):
+        scale = min(max_width / width, max_height / height, 1)
+        loader.set_size(max(1, int(width * scale)), max(1, int(height * scale)))
+
+    loader.connect("size-prepared", on_size)
+    try:
+        loader.write(data)
+        loader.close()
+    except GLib.Error:
+        return None
+    return loader.get_pixbuf()
+
+
+class ThumbnailCache:
+    """Thumbnails built off the main thread, cached in memory and on disk.
+
+    A hit in index.json whose preview line still matches is read from disk
+    without running `cliphist decode`. Misses are decoded and scaled in a
+    worker pool, then saved under their content hash, so identical images
+    copied twice share one file. Callbacks always run on the main loop.
+    """
+
+    def __init__(self):
+        self.memory = OrderedDict()
+        self.pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS)
+        # id -> [future, callbacks] for thumbnails being built
+        self.pending = {}
+        self.index = self._load_index()
+        self._save_source = None
+        self.disk_bytes = 0
+        self.files = {}
+        try:
+            os.makedirs(THUMB_DIR, exist_ok=True)
+            for f in os.scandir(THUMB_DIR):
+                if f.name.endswith(".png"):
+                    st = f.stat()
+                    self.files[f.name[:-4]] = (st.st_mtime, st.st_size)
+                    self.disk_bytes += st.st_size
+        except OSError:
+            pass
+
+    def _load_index(self):
+        try:
+            with open(THUMB_INDEX, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        self._save_source = None
+        tmp = THUMB_INDEX + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp, THUMB_INDEX)
+        except OSError:
+            pass
+        return False
+
+    def _schedule_save(self):
+        if self._save_source is None:
+            self._save_source = GLib.timeout_add(SAVE_DELAY_MS, self._save_index)
+
+    def peek(self, entry_id):
+        """The thumbnail if it is already in memory, else None."""
+        pixbuf = self.memory.get(entry_id)
+        if pixbuf is not None:
+            self.memory.move_to_end(entry_id)
+        return pixbuf
+
+    def request(self, entry, callback):
+        """Call callback(pixbuf or None) from the main loop, later."""
+        entry_id = entry["id"]
+        if entry_id in self.memory:
+            GLib.idle_add(callback, self.peek(entry_id))
+            return
+        if entry_id in self.pending:
+            self.pending[entry_id][1].append(callback)
+            return
+
+        cached = self.index.get(entry_id)
+        digest = None
+        if cached and cached[0] == entry["content"] and cached[1] in self.files:
+            digest = cached[1]
+        future = self.pool.submit(self._build, entry, digest)
+        self.pending[entry_id] = [future, [callback]]
+        future.add_done_callback(
+            lambda f: GLib.idle_add(self._finish, entry, f)
+        )
+
+    def _path(self, digest):
+        return os.path.join(THUMB_DIR, f"{digest}.png")
+
+    def _build(self, entry, digest):
+        """Worker: (digest, pixbuf, new file size or 0)."""
+        if digest:
+            try:
+                path = self._path(digest)
+                os.utime(path)
+                return digest, GdkPixbuf.Pixbuf.new_from_file(path), 0
+            except (OSError, GLib.Error):
+                pass
+        data = decode(entry["id"], entry["content"])
+        if not data:
+            return None, None, 0
+        digest = hashlib.sha1(data).hexdigest()
+        path = self._path(digest)
+        if digest in self.files:
+            try:
+                os.utime(path)
+                return digest, GdkPixbuf.Pixbuf.new_from_file(path), 0
+            except (OSError, GLib.Error):
+                pass
+        pixbuf = scaled_pixbuf(data)
+        if pixbuf is None:
+            return None, None, 0
+        try:
+            pixbuf.savev(path, "png", [], [])
+            size = os.path.getsize(path)
+        except (OSError, GLib.Error):
+            size = 0
+        return digest, pixbuf, size
+
+    def _finish(self, entry, future):
+        if future.cancelled():
+            return False
+        callbacks = []
+        if self.pending.get(entry["id"], [None])[0] is future:
+            callbacks = self.pending.pop(entry["id"])[1]
+        try:
+            digest, pixbuf, size = future.result()
+        except Exception:
+            digest, pixbuf, size = None, None, 0
+        if digest:
+            known = self.files.get(digest, (0, 0))[1]
+            self.files[digest] = (time.time(), size or known)
+            if size:
+                self.disk_bytes += size
+                self._evict()
+            if self.index.get(entry["id"]) != [entry["content"], digest]:
+                self.index[entry["id"]] = [entry["content"], digest]
+                self._schedule_save()
+        if pixbuf is not None:
+            self.memory[entry["id"]] = pixbuf
+            if len(self.memory) > THUMB_MEMORY:
+                self.memory.popitem(last=False)
+        for callback in callbacks:
+            callback(pixbuf)
+        return False
+
+    def flush(self):
+        """Write a pending index save now (the window is going away)."""
+        self.cancel_pending()
+        if self._save_source is not None:
+            GLib.source_remove(self._save_source)
+            self._save_index()
+
+    def _evict(self):
+        if self.disk_bytes <= THUMB_CACHE_MAX:
+            return
+        evicted = set()
+        for digest, (_, size) in sorted(self.files.items(), key=lambda kv: kv[1][0]):
+            if self.disk_bytes <= THUMB_CACHE_MAX * 0.9:
+                break
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+            self.disk_bytes -= size
+            evicted.add(digest)
+        for digest in evicted:
+            del self.files[digest]
+        self.index = {k: v for k, v in self.index.items() if v[1] not in evicted}
+        self._schedule_save()
+
+    def forget(self, entry_ids):
+        """Drop deleted entries (their files age out through the LRU)."""
+        for entry_id in entry_ids:
+            self.memory.pop(entry_id, None)
+            self.index.pop(entry_id, None)
+        self._schedule_save()
+
+    def clear(self):
+        self.cancel_pending()
+        self.memory.clear()
+        self.index = {}
+        for digest in self.files:
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+        self.files = {}
+        self.disk_bytes = 0
+        self._schedule_save()
+
+    def cancel_pending(self):
+        """Drop queued work (rows went away); running decodes finish and
+        are still cached."""
+        for entry_id, (future, _) in list(self.pending.items()):
+            if future.cancel():
+                del self.pending[entry_id]
@@ -0,0 +1,172 @@
+"""Tech HUD — minimal Desktop Entry Specification parser (GTK-free)
+
+Reads only the unlocalized keys of the [Desktop Entry] group and stops at
+the next group header, so [Desktop Action ...] groups and Name[xx]
+translations are never parsed.
+"""
+
+# Field codes dropped when launching without files/URLs (spec §7)
+FILE_FIELD_CODES = set("fFuU")
+DEPRECATED_FIELD_CODES = set("dDnNvm")
+
+ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+
+# Characters that must be backslash-escaped inside a quoted Exec argument
+EXEC_QUOTED_ESCAPES = set('"`$\\')
+
+
+class ExecError(ValueError):
+    pass
+
+
+def unescape(value):
+    """Apply the string escapes \\s \\n \\t \\r \\\\ (spec §4)."""
+    if "\\" not in value:
+        return value
+    out = []
+    i = 0
+    n = len(value)
+    while i < n:
+        ch = value[i]
+        if ch == "\\" and i + 1 < n and value[i + 1] in ESCAPES:
+            out.append(ESCAPES[value[i + 1]])
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def read_desktop_entry(path):
+    """Return {key: raw value} of the [Desktop Entry] group, or None.
+
+    Values are left unescaped; use unescape() for string keys and
+    split_exec() for Exec. The first occurrence of a key wins.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse_lines(f)
+    except OSError:
+        return None
+
+
+def parse_lines(lines):
+    keys = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == "#":
+            continue
+        if line[0] == "[":
+            if keys is not None:
+                break
+            if line == "[Desktop Entry]":
+                keys = {}
+            continue
+        if keys is None:
+            continue
+        eq = line.find("=")
+        if eq <= 0:
+            continue
+        key = line[:eq].rstrip()
+        if "[" in key or key in keys:
+            continue
+        keys[key] = line[eq + 1:].lstrip()
+    return keys
+
+
+def split_exec(value):
+    """Split an unescaped-per-§4 Exec value into argv following the
+    quoting rules of spec §7. Raises ExecError on unbalanced quotes or
+    a dangling escape."""
+    args = []
+    current = []
+    in_arg = False
+    quoted = False
+    i = 0
+    n = len(value)
+    while i < n:
+        ch = value[i]
+        if quoted:
+            if ch == "\\":
+                if i + 1 >= n or value[i + 1] not in EXEC_QUOTED_ESCAPES:
+                    raise ExecError(f"invalid escape in quoted argument: {value!r}")
+                current.append(value[i + 1])
+                i += 2
+                continue
+            if ch == '"':
+                quoted = False
+            else:
+                current.append(ch)
+        elif ch == '"':
+            quoted = True
+            in_arg = True
+        elif ch in " \t\n":
+            if in_arg:
+                args.append("".join(current))
+                current = []
+                in_arg = False
+        else:
+            current.append(ch)
+            in_arg = True
+        i += 1
+    if quoted:
+        raise ExecError(f"unterminated quote: {value!r}")
+    if in_arg:
+        args.append("".join(current))
+    return args
+
+
+def expand_field_codes(argv, icon="", name="", location=""):
+    """Expand %i %c %k and %%, drop file/URL and deprecated codes."""
+    out = []
+    for arg in argv:
+        if len(arg) == 2 and arg[0] == "%":
+            code = arg[1]
+            if code in FILE_FIELD_CODES or code in DEPRECATED_FIELD_CODES:
+                continue
+            if code == "i":
+                if icon:
+                    out.extend(["--icon", icon])
+                continue
+            if code == "c":
+                out.append(name)
+                continue
+            if code == "k":
+                if location:
+                    out.append(location)
+                continue
+        if "%" not in arg:
+            out.append(arg)
+            continue
+        expanded = []
+        i = 0
+        while i < len(arg):
+            ch = arg[i]
+            if ch == "%" and i + 1 < len(arg):
+                code = arg[i + 1]
+                if code == "%":
+                    expanded.append("%")
+                elif code == "c":
+                    expanded.append(name)
+                elif code == "k":
+                    expanded.append(location)
+                # Other codes inside a larger argument are dropped
+                i += 2
+                continue
+            expanded.append(ch)
+            i += 1
+        out.append("".join(expanded))
+    return out
+
+
+def parse_exec(value, icon="", name="", location=""):
+    """Exec key value -> argv ready to spawn, or [] if it's invalid."""
+    try:
+        argv = split_exec(unescape(value))
+    except ExecError:
+        return []
+    return expand_field_codes(argv, icon, name, location)
+
+
+def is_true(value):
+    return value is not None and value.strip().lower() == "true"
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Tech HUD Popup Host — keeps launcher, clipboard and power menu resident
+
+Builds all three windows once and shows/hides them on commands received
+over a Unix socket (see hud_host.py). launcher-ui.py, clipboard-ui.py and
+power-ui.py forward their toggle here when the host is running.
+"""
+
+import importlib.util
+import os
+import signal
+import sys
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("GtkLayerShell", "0.1")
+from gi.repository import Gtk, Gio, GLib
+
+import hud_host
+from launcher_entries import APP_DIRS
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# popup name -> (script file, window class)
+POPUP_SCRIPTS = {
+    "launcher": ("launcher-ui.py", "AppLauncher"),
+    "clipboard": ("clipboard-ui.py", "ClipboardManager"),
+    "power": ("power-ui.py", "PowerMenu"),
+}
+
+# Coalesce bursts of file-monitor events (package installs touch many files)
+RELOAD_DELAY_MS = 300
+
+
+def load_script(name, fname):
+    path = os.path.join(SCRIPTS_DIR, fname)
+    spec = importlib.util.spec_from_file_location(f"hud_{name}_ui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class PopupHost:
+    def __init__(self):
+        self.modules = {}
+        self.windows = {}
+        self.monitors = []
+        self._pending = {}
+
+        for name, (fname, cls_name) in POPUP_SCRIPTS.items():
+            module = load_script(name, fname)
+            self.modules[name] = module
+            win = getattr(module, cls_name)(resident=True)
+            # _quit() hides a resident popup and stops its background work
+            win.connect("delete-event", lambda w, e: w._quit() or True)
+            self.windows[name] = win
+
+        self._watch_files()
+        self._listen()
+
+    def _listen(self):
+        try:
+            os.remove(hud_host.SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+        self.service = Gio.SocketService()
+        address = Gio.UnixSocketAddress.new(hud_host.SOCKET_PATH)
+        self.service.add_address(
+            address, Gio.SocketType.STREAM, Gio.SocketProtocol.DEFAULT, None
+        )
+        os.chmod(hud_host.SOCKET_PATH, 0o600)
+        self.service.connect("incoming", self._on_incoming)
+        self.service.start()
+
+    def _watch(self, path, directory, callback):
+        gfile = Gio.File.new_for_path(path)
+        try:
+            if directory:
+                monitor = gfile.monitor_directory(Gio.FileMonitorFlags.NONE, None)
+            else:
+                monitor = gfile.monitor_file(Gio.FileMonitorFlags.NONE, None)
+        except GLib.Error:
+            return
+        monitor.connect("changed", lambda *args: self._schedule(path, callback))
+        self.monitors.append(monitor)
+
+    def _watch_files(self):
+        launcher = self.windows["launcher"]
+        for app_dir in APP_DIRS:
+            if os.path.isdir(app_dir):
+                self._watch(app_dir, True, launcher.reload_apps)
+        for name, win in self.windows.items():
+            self._watch(self.modules[name].CSS_FILE, False, win.reload_css)
+
+    def _schedule(self, key, callback):
+        if key in self._pending:
+            GLib.source_remove(self._pending[key])
+
+        def fire():
+            del self._pending[key]
+            callback()
+            return False
+
+        self._pending[key] = GLib.timeout_add(RELOAD_DELAY_MS, fire)
+
+    def _on_incoming(self, service, connection, source):
+        stream = Gio.DataInputStream.new(connection.get_input_stream())
+        stream.read_line_async(
+            GLib.PRIORITY_DEFAULT, None, self._on_line, connection
+        )
+        return True
+
+    def _on_line(self, stream, result, connection):
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+            reply = self.handle(line or "")
+        except GLib.Error as e:
+            reply = f"error {e.message}"
+        try:
+            connection.get_output_stream().write_all(
+                (reply + "\n").encode(), None
+            )
+            connection.close(None)
+        except GLib.Error:
+            pass
+
+    def handle(self, line):
+        try:
+            command, popup = hud_host.parse(line)
+        except ValueError as e:
+            return f"error {e}"
+        if command == "ping":
+            return "ok"
+        if command == "quit":
+            GLib.idle_add(self.quit)
+            return "ok"
+
+        win = self.windows[popup]
+        visible = win.get_visible()
+        if command == "hide" or (command == "toggle" and visible):
+            if visible:
+                win._quit()
+        elif not visible:
+            win.popup()
+        return "ok"
+
+    def quit(self):
+        self.service.stop()
+        try:
+            os.remove(hud_host.SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+        Gtk.main_quit()
+        return False
+
+
+def main():
+    if "--profile" in sys.argv:
+        # Picked up by each popup's Profiler
+        os.environ["HUD_PROFILE"] = "1"
+    if hud_host.request("ping") == "ok":
+        print("hud-host: already running", file=sys.stderr)
+        return
+
+    host = PopupHost()
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, host.quit)
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, host.quit)
+    Gtk.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Tech HUD — control socket shared by hud-host.py and its thin clients
+
+Kept free of gi so a popup script can forward its toggle to a running
+host before paying for GTK start-up.
+"""
+
+import os
+import socket
+
+SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp",
+    f"tech-hud-{os.getuid()}.sock",
+)
+
+# Client side gives up quickly so a wedged host never blocks a click
+CLIENT_TIMEOUT = 0.5
+
+POPUPS = ["launcher", "clipboard", "power"]
+COMMANDS = ["toggle", "show", "hide"]
+
+
+def request(command, timeout=CLIENT_TIMEOUT):
+    """Send one command line, return the reply line or None if no host."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(SOCKET_PATH)
+        sock.sendall(command.encode() + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(256)
+            if not chunk:
+                break
+            reply += chunk
+        return reply.decode(errors="replace").strip()
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def forward(popup, command="toggle"):
+    """True if a running host handled the command for popup."""
+    return request(f"{command} {popup}") == "ok"
+
+
+def parse(line):
+    """Split a command line into (command, popup); raises ValueError."""
+    parts = line.split()
+    if parts == ["ping"] or parts == ["quit"]:
+        return parts[0], None
+    if len(parts) != 2 or parts[0] not in COMMANDS or parts[1] not in POPUPS:
+        raise ValueError(f"bad command: {line!r}")
+    return parts[0], parts[1]
@@ -0,0 +1,349 @@
+"""Tech HUD — in-process Hyprland IPC and logind client (no hyprctl/systemctl)
+
+    hyprland().dispatch("exit")
+    hyprland().json("clients")
+    logind().call("PowerOff")
+
+Hyprland answers one request per connection on its request socket, so a
+request costs a connect() rather than a hyprctl fork/exec, and batch()
+sends several commands over one. The event socket and the system bus
+connection are persistent. FakeHyprland serves both sockets from a
+temporary directory, so callers can be exercised without a compositor.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+REQUEST_SOCKET = ".socket.sock"
+EVENT_SOCKET = ".socket2.sock"
+HYPR_TIMEOUT = 2.0
+READ_CHUNK = 65536
+LOGIND_BUS = "org.freedesktop.login1"
+LOGIND_PATH = "/org/freedesktop/login1"
+LOGIND_INTERFACE = "org.freedesktop.login1.Manager"
+
+
+class IPCError(Exception):
+    pass
+
+
+def hypr_dir(env=None):
+    """This Hyprland instance's socket directory, or None outside Hyprland."""
+    env = os.environ if env is None else env
+    signature = env.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+    runtime = env.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    # Hyprland before 0.40 kept its sockets under /tmp
+    for base in (os.path.join(runtime, "hypr"), "/tmp/hypr"):
+        path = os.path.join(base, signature)
+        if os.path.exists(os.path.join(path, REQUEST_SOCKET)):
+            return path
+    return None
+
+
+class Hyprland:
+    def __init__(self, directory=None):
+        self.dir = directory or hypr_dir()
+
+    def _path(self, name):
+        if not self.dir:
+            raise IPCError("hyprland: no running instance (HYPRLAND_INSTANCE_SIGNATURE)")
+        return os.path.join(self.dir, name)
+
+    def request(self, command):
+        """Send one request, return the reply text."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(HYPR_TIMEOUT)
+        chunks = []
+        try:
+            sock.connect(self._path(REQUEST_SOCKET))
+            sock.sendall(command.encode())
+            while True:
+                chunk = sock.recv(READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError as e:
+            raise IPCError(f"hyprland: {e}")
+        finally:
+            sock.close()
+        return b"".join(chunks).decode("utf-8", "replace")
+
+    def json(self, what):
+        """A query (clients, monitors, activewindow, ...) decoded from JSON."""
+        reply = self.request(f"j/{what}")
+        try:
+            return json.loads(reply)
+        except ValueError:
+            raise IPCError(f"hyprland: {what}: {reply.strip()[:80]}")
+
+    def dispatch(self, *args):
+        self._check(self.request(" ".join(("dispatch",) + args)))
+
+    def batch(self, commands):
+        """Run several commands ("dispatch ...", "keyword ...") in one request."""
+        if commands:
+            self._check(self.request("[[BATCH]]" + ";".join(commands)))
+
+    def _check(self, reply):
+        # Each command answers "ok"; any other line is an error message
+        errors = [line for line in map(str.strip, reply.splitlines()) if line and line != "ok"]
+        if errors:
+            raise IPCError("hyprland: " + "; ".join(errors))
+
+    def events(self):
+        return EventSocket(self._path(EVENT_SOCKET))
+
+
+class EventSocket:
+    """A persistent connection to Hyprland's event socket.
+
+    Non-blocking: watch fileno() from a main loop and call read() when it
+    is readable. read() raises IPCError once Hyprland closes the socket;
+    connect() again to resume.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sock = None
+        self._tail = b""
+        self.connect()
+
+    def connect(self):
+        self.close()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise IPCError(f"hyprland events: {e}")
+        sock.setblocking(False)
+        self.sock = sock
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read(self):
+        """[(event, data)] for the complete lines received so far."""
+        try:
+            chunk = self.sock.recv(READ_CHUNK)
+        except BlockingIOError:
+            return []
+        except OSError as e:
+            raise IPCError(f"hyprland events: {e}")
+        if not chunk:
+            raise IPCError("hyprland events: connection closed")
+        lines = (self._tail + chunk).split(b"\n")
+        self._tail = lines.pop()
+        events = []
+        for line in lines:
+            name, sep, data = line.decode("utf-8", "replace").partition(">>")
+            if sep:
+                events.append((name, data))
+        return events
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        self._tail = b""
+
+
+class CloseWindows:
+    """Asks every mapped window to close at once and follows them closing
+    on the event socket.
+
+    Call read() whenever fileno() is readable; it returns True once no
+    window is left (or the compositor is gone). Raises IPCError when the
+    windows cannot be listed or asked.
+    """
+
+    def __init__(self, hypr):
+        # Listening before listing, so no close goes unseen
+        self.events = hypr.events()
+        try:
+            clients = hypr.json("clients")
+            # Addresses in events carry no 0x prefix
+            self.pending = {
+                c["address"].removeprefix("0x"): c.get("class") or c.get("title") or "?"
+                for c in clients if c.get("mapped", True)
+            }
+            if self.pending:
+                hypr.batch([f"dispatch closewindow address:0x{a}" for a in self.pending])
+        except IPCError:
+            self.events.close()
+            raise
+        self.total = len(self.pending)
+
+    def fileno(self):
+        return self.events.fileno()
+
+    def read(self):
+        try:
+            for event, data in self.events.read():
+                if event == "closewindow":
+                    self.pending.pop(data, None)
+        except IPCError:
+            self.pending.clear()
+        return not self.pending
+
+    def names(self):
+        """Classes (or titles) of the windows still open."""
+        return sorted(set(self.pending.values()))
+
+    def close(self):
+        self.events.close()
+
+
+class Logind:
+    """logind's Manager over the (shared, persistent) system bus connection."""
+
+    def __init__(self, bus=None):
+        from gi.repository import Gio, GLib
+
+        if bus is None:
+            try:
+                bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+            except GLib.Error as e:
+                raise IPCError(f"logind: {e.message}")
+        self.bus = bus
+
+    def call(self, method, interactive=True):
+        """PowerOff, Reboot, Suspend, Hibernate...; `interactive` lets
+        polkit ask for authentication, as systemctl does."""
+        from gi.repository import Gio, GLib
+
+        try:
+            self.bus.call_sync(
+                LOGIND_BUS, LOGIND_PATH, LOGIND_INTERFACE, method,
+                GLib.Variant("(b)", (interactive,)), None,
+                Gio.DBusCallFlags.ALLOW_INTERACTIVE_AUTHORIZATION, -1, None,
+            )
+        except GLib.Error as e:
+            raise IPCError(f"logind: {method}: {e.message}")
+
+
+_hyprland = None
+_logind = None
+
+
+def hyprland():
+    global _hyprland
+    if _hyprland is None or not _hyprland.dir:
+        _hyprland = Hyprland()
+    return _hyprland
+
+
+def logind():
+    global _logind
+    if _logind is None:
+        _logind = Logind()
+    return _logind
+
+
+class FakeHyprland:
+    """A stand-in compositor serving both sockets from a temporary directory.
+
+        with FakeHyprland({"j/clients": "[]"}) as fake:
+            Hyprland(fake.dir).dispatch("exit")
+            fake.requests            # ["dispatch exit"]
+            fake.emit("openwindow", "5a3e,1,kitty,~")
+
+    Requests not in `replies` answer "ok" (once per batched command); a
+    reply may also be a function of the request.
+    """
+
+    def __init__(self, replies=None):
+        self.replies = dict(replies or {})
+        self.requests = []
+        self.dir = None
+        self._servers = []
+        self._event_server = None
+        self._event_clients = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self.dir = tempfile.mkdtemp(prefix="fake-hypr-")
+        server = self._listen(REQUEST_SOCKET)
+        threading.Thread(target=self._accept, args=(server,), daemon=True).start()
+        # Event clients are accepted by emit(): a client counts as
+        # listening as soon as its connect() returns
+        self._event_server = self._listen(EVENT_SOCKET)
+        self._event_server.setblocking(False)
+
+    def _listen(self, name):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(os.path.join(self.dir, name))
+        server.listen()
+        self._servers.append(server)
+        return server
+
+    def _accept(self, server):
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # stopped
+            self._serve_request(conn)
+
+    def _serve_request(self, conn):
+        with conn:
+            request = conn.recv(READ_CHUNK).decode("utf-8", "replace")
+            with self._lock:
+                self.requests.append(request)
+            reply = self.replies.get(request)
+            if callable(reply):
+                reply = reply(request)
+            if reply is None:
+                commands = request.removeprefix("[[BATCH]]").split(";")
+                reply = "\n\n".join("ok" for _ in commands)
+            conn.sendall(reply.encode())
+
+    def _accept_events(self):
+        while self._event_server is not None:
+            try:
+                conn, _ = self._event_server.accept()
+            except OSError:
+                return  # none pending, or stopped
+            conn.setblocking(True)
+            self._event_clients.append(conn)
+
+    def emit(self, event, data=""):
+        line = f"{event}>>{data}\n".encode()
+        with self._lock:
+            self._accept_events()
+            for conn in list(self._event_clients):
+                try:
+                    conn.sendall(line)
+                except OSError:
+                    self._event_clients.remove(conn)
+
+    def drop_event_clients(self):
+        """Close event connections, as a compositor restart would."""
+        with self._lock:
+            self._accept_events()
+            clients, self._event_clients = self._event_clients, []
+        for conn in clients:
+            conn.close()
+
+    def stop(self):
+        self.drop_event_clients()
+        for server in self._servers:
+            server.close()
+        self._servers = []
+        self._event_server = None
+        if self.dir:
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.dir = None
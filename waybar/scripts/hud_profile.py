@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Tech HUD — opt-in startup/interaction profiling for the popups
+
+Enabled by HUD_PROFILE=1 in the environment or --profile on the command
+line. Each popup run appends one JSON line to PROFILE_LOG:
+
+    {"popup": "launcher", "ts": ..., "resident": false,
+     "phases": {"imports": [0.0, 81.2], "css": [81.3, 84.0], ...},
+     "samples": {"keystroke_ms": [0.8, 1.1, ...]}}
+
+Phase values are [start, end] in ms since the script started. Run this
+file to summarize the log:
+
+    hud_profile.py [--popup NAME] [--last N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_LOG = os.path.expanduser("~/.cache/tech-hud-profile.jsonl")
+PROFILE_LOG_MAX = 1024 * 1024
+
+
+def profiling_enabled():
+    return bool(os.environ.get("HUD_PROFILE")) or "--profile" in sys.argv
+
+
+class Profiler:
+    """Phase timestamps and latency samples for one popup.
+
+    Also reports time-to-first-frame and time-to-fully-populated on
+    stderr when HUD_TIMINGS is set, independent of HUD_PROFILE.
+    """
+
+    def __init__(self, popup, start=None):
+        self.popup = popup
+        self.enabled = profiling_enabled()
+        self.timings = bool(os.environ.get("HUD_TIMINGS"))
+        self.start = time.monotonic() if start is None else start
+        self.phases = {}
+        self.samples = {}
+        self._window = None
+        self._draw_handler = None
+
+    def _ms(self, t):
+        return round((t - self.start) * 1000, 3)
+
+    def record(self, name, start, end):
+        if name not in self.phases:
+            self.phases[name] = [self._ms(start), self._ms(end)]
+
+    def mark(self, name):
+        now = time.monotonic()
+        self.record(name, now, now)
+        if name in ("first_draw", "populated"):
+            self._report_timings()
+
+    @contextmanager
+    def phase(self, name):
+        t = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, t, time.monotonic())
+
+    def sample(self, metric, ms):
+        if self.enabled:
+            self.samples.setdefault(metric, []).append(round(ms, 3))
+
+    def watch(self, window):
+        """Mark first_draw on the window's next draw signal."""
+        self._window = window
+        if self._draw_handler is None:
+            self._draw_handler = window.connect("draw", self._on_draw)
+
+    def _on_draw(self, *args):
+        self._window.disconnect(self._draw_handler)
+        self._draw_handler = None
+        self.mark("first_draw")
+        return False
+
+    def restart(self, window=None):
+        """Begin a new run (a resident popup being shown again)."""
+        self.flush()
+        self.start = time.monotonic()
+        if window is not None:
+            self.watch(window)
+
+    def _report_timings(self):
+        if not self.timings:
+            return
+        first = self.phases.get("first_draw")
+        populated = self.phases.get("populated")
+        if first is None or populated is None:
+            return
+        print(
+            f"{self.popup}: first frame {first[1]:.1f} ms, "
+            f"fully populated {populated[1]:.1f} ms",
+            file=sys.stderr,
+        )
+
+    def flush(self, resident=False):
+        """Append this run to PROFILE_LOG and start collecting afresh."""
+        if self.enabled and (self.phases or self.samples):
+            record = {
+                "popup": self.popup,
+                "ts": time.time(),
+                "resident": resident,
+                "phases": self.phases,
+                "samples": self.samples,
+            }
+            try:
+                os.makedirs(os.path.dirname(PROFILE_LOG), exist_ok=True)
+                try:
+                    if os.path.getsize(PROFILE_LOG) > PROFILE_LOG_MAX:
+                        os.replace(PROFILE_LOG, PROFILE_LOG + ".1")
+                except FileNotFoundError:
+                    pass
+                with open(PROFILE_LOG, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+        self.phases = {}
+        self.samples = {}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def load_runs(path=PROFILE_LOG, popup=None, last=None):
+    runs = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if popup and run.get("popup") != popup:
+                    continue
+                runs.append(run)
+    except FileNotFoundError:
+        pass
+    return runs[-last:] if last else runs
+
+
+def summarize(runs):
+    """{popup: {row label: [values]}} for phase ends, durations and samples."""
+    table = {}
+    for run in runs:
+        rows = table.setdefault(run.get("popup", "?"), {})
+        for name, (start, end) in run.get("phases", {}).items():
+            if end > start:
+                rows.setdefault(f"{name} (dur)", []).append(end - start)
+            rows.setdefault(f"{name} (at)", []).append(end)
+        for metric, values in run.get("samples", {}).items():
+            rows.setdefault(metric, []).extend(values)
+    return table
+
+
+def report(runs, path=PROFILE_LOG, out=sys.stdout):
+    table = summarize(runs)
+    if not table:
+        print(f"no profile data in {path}", file=out)
+        return
+    header = f"{'metric (ms)':<28}{'n':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"
+    for popup in sorted(table):
+        print(f"\n[{popup}]", file=out)
+        print(header, file=out)
+        rows = table[popup]
+        for label in sorted(rows, key=lambda l: (min(rows[l]), l)):
+            values = rows[label]
+            print(
+                f"{label:<28}{len(values):>6}"
+                f"{percentile(values, 50):>10.2f}{percentile(values, 90):>10.2f}"
+                f"{percentile(values, 99):>10.2f}{max(values):>10.2f}",
+                file=out,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Tech HUD profile runs")
+    parser.add_argument("--popup", choices=["launcher", "clipboard", "power"])
+    parser.add_argument("--last", type=int, help="only the N most recent runs")
+    parser.add_argument("--log", default=PROFILE_LOG)
+    args = parser.parse_args()
+    report(load_runs(args.log, args.popup, args.last), args.log)
+
+
+if __name__ == "__main__":
+    main()
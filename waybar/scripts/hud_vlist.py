@@ -0,0 +1,265 @@
+"""Tech HUD — virtualized list shared by the launcher and clipboard popups"""
+
+from gi.repository import Gdk, Gtk
+
+# Wheel notches scroll this many rows
+SCROLL_ROWS = 3
+# Items bound to a probe row to measure the shared row height
+MEASURE_ITEMS = 8
+
+
+def set_class(widget, name, on):
+    ctx = widget.get_style_context()
+    if on:
+        ctx.add_class(name)
+    else:
+        ctx.remove_class(name)
+
+
+class VirtualList(Gtk.Box):
+    """A scrolling list that only has widgets for the rows on screen.
+
+    `items` is a plain list of model objects. make_row() builds a row
+    widget for the pool (one viewport's worth plus one), and
+    bind_row(row, item) points a pooled row at an item; it is called again
+    whenever the view scrolls onto a different item. All rows share one
+    height, measured from the first few items. Change `items` in place
+    and call changed(), call insert(), or call set_items().
+
+    Up/Down/PageUp/PageDown/Home/End move a cursor (the "cursor" style
+    class on its row), calling on_cursor(item), and Return calls
+    on_activate(item).
+    """
+
+    def __init__(self, make_row, bind_row, on_activate=None, on_cursor=None):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.on_activate = on_activate
+        self.on_cursor = on_cursor
+        self.items = []
+        self.pool = []
+        self.row_height = 0
+        self.cursor = -1
+        self._width = 0
+        self._height = 0
+
+        self.adjustment = Gtk.Adjustment()
+        self.adjustment.connect("value-changed", lambda adj: self._layout())
+
+        # A Gtk.Layout clips rows scrolled partly out of view and, unlike
+        # Gtk.Fixed, requests no size for them (the window never grows)
+        self.canvas = Gtk.Layout()
+        self.canvas.add_events(Gdk.EventMask.SCROLL_MASK | Gdk.EventMask.SMOOTH_SCROLL_MASK)
+        self.canvas.connect("scroll-event", self._on_scroll)
+        self.canvas.connect("size-allocate", self._on_allocate)
+        self.canvas.set_hexpand(True)
+        self.canvas.set_vexpand(True)
+        self.pack_start(self.canvas, True, True, 0)
+
+        self.scrollbar = Gtk.Scrollbar(
+            orientation=Gtk.Orientation.VERTICAL, adjustment=self.adjustment
+        )
+        self.scrollbar.set_no_show_all(True)
+        self.pack_end(self.scrollbar, False, False, 0)
+
+        self.set_can_focus(True)
+        self.connect("key-press-event", self._on_key)
+
+    # -- model ---------------------------------------------------------
+
+    def set_items(self, items):
+        """Show a new list from the top."""
+        self.items = items
+        self.cursor = -1
+        self.adjustment.set_value(0)
+        self.changed()
+
+    def changed(self):
+        """Items were added or removed: rebind rows whose item moved."""
+        self.cursor = min(self.cursor, len(self.items) - 1)
+        self._update_range()
+        self._layout()
+
+    def insert(self, index, items):
+        """Insert items at `index` without moving what is on screen,
+        unless the view is at the very top (then new rows show up)."""
+        if not items:
+            return
+        self.items[index:index] = items
+        if self.cursor >= index:
+            self.cursor += len(items)
+        value = self.adjustment.get_value()
+        self._update_range()
+        if value > 0 and index * self.row_height <= value:
+            self.adjustment.set_value(value + len(items) * self.row_height)
+        self._layout()
+
+    def remove(self, start, stop):
+        """Remove items[start:stop] without moving what is on screen."""
+        if start >= stop:
+            return
+        count = len(self.items[start:stop])
+        del self.items[start:stop]
+        if self.cursor >= stop:
+            self.cursor -= count
+        elif self.cursor >= start:
+            self.cursor = -1
+        value = self.adjustment.get_value()
+        if stop * self.row_height <= value:
+            value -= count * self.row_height
+        self._update_range()
+        self.adjustment.set_value(value)
+        self._layout()
+
+    def refresh(self):
+        """Rebind every on-screen row (an item's state changed in place)."""
+        self._layout(force=True)
+
+    def visible_range(self):
+        """(first, last) item index on screen, last exclusive."""
+        if not self.row_height:
+            return 0, 0
+        first = int(self.adjustment.get_value() // self.row_height)
+        last = first + int(self._height // self.row_height) + 1
+        return first, min(last, len(self.items))
+
+    # -- layout --------------------------------------------------------
+
+    def _measure(self):
+        # Tallest of the first few items, so headers and entries both fit
+        if self.row_height or not self.items:
+            return
+        # Parented first, so CSS scoped by the window applies
+        probe = self._add_row()
+        height = 1
+        for item in self.items[:MEASURE_ITEMS]:
+            probe.item = item
+            self.bind_row(probe, item)
+            height = max(height, *probe.get_preferred_height())
+        self.row_height = height
+        probe.item = None
+
+    def _add_row(self):
+        row = self.make_row()
+        row.item = None
+        # Visibility is ours (and bind_row's) from here on: the window's
+        # show_all() must not reveal spare rows or toggled parts
+        row.show_all()
+        row.set_no_show_all(True)
+        row.hide()
+        self.pool.append(row)
+        self.canvas.put(row, 0, 0)
+        return row
+
+    def _ensure_pool(self):
+        self._measure()
+        if not self.row_height:
+            return
+        needed = int(self._height // self.row_height) + 2
+        while len(self.pool) < needed:
+            self._add_row()
+        for row in self.pool:
+            row.set_size_request(self._width, self.row_height)
+
+    def _update_range(self):
+        self._ensure_pool()
+        total = len(self.items) * self.row_height
+        adj = self.adjustment
+        adj.configure(
+            min(adj.get_value(), max(0, total - self._height)),
+            0,
+            total,
+            self.row_height or 1,
+            max(self._height - self.row_height, 1),
+            self._height,
+        )
+        self.scrollbar.set_visible(total > self._height)
+
+    def _on_allocate(self, widget, allocation):
+        if (allocation.width, allocation.height) == (self._width, self._height):
+            return
+        self._width, self._height = allocation.width, allocation.height
+        self._update_range()
+        self._layout(force=True)
+
+    def _layout(self, force=False):
+        if not self.row_height:
+            self._measure()
+            if not self.row_height:
+                return
+        value = self.adjustment.get_value()
+        first = int(value // self.row_height)
+        offset = value - first * self.row_height
+        for i, row in enumerate(self.pool):
+            index = first + i
+            if index < len(self.items):
+                item = self.items[index]
+                if force or row.item is not item:
+                    row.item = item
+                    self.bind_row(row, item)
+                set_class(row, "cursor", index == self.cursor)
+                self.canvas.move(row, 0, int(i * self.row_height - offset))
+                row.show()
+            else:
+                row.item = None
+                row.hide()
+
+    # -- input ---------------------------------------------------------
+
+    def _on_scroll(self, widget, event):
+        adj = self.adjustment
+        ok, dx, dy = event.get_scroll_deltas()
+        if not ok:
+            if event.direction == Gdk.ScrollDirection.UP:
+                dy = -1
+            elif event.direction == Gdk.ScrollDirection.DOWN:
+                dy = 1
+            else:
+                return False
+        step = dy * SCROLL_ROWS * self.row_height
+        top = adj.get_upper() - adj.get_page_size()
+        adj.set_value(max(0, min(adj.get_value() + step, top)))
+        return True
+
+    def scroll_to(self, index):
+        """Scroll just enough to show item `index`."""
+        if not self.row_height:
+            return
+        adj = self.adjustment
+        top = index * self.row_height
+        if top < adj.get_value():
+            adj.set_value(top)
+        elif top + self.row_height > adj.get_value() + self._height:
+            adj.set_value(top + self.row_height - self._height)
+
+    def set_cursor(self, index):
+        if not self.items:
+            self.cursor = -1
+            return
+        self.cursor = max(0, min(index, len(self.items) - 1))
+        self.scroll_to(self.cursor)
+        self._layout()
+        if self.on_cursor:
+            self.on_cursor(self.items[self.cursor])
+
+    def _on_key(self, widget, event):
+        page = max(1, int(self._height // self.row_height)) if self.row_height else 1
+        moves = {
+            Gdk.KEY_Down: 1, Gdk.KEY_Up: -1,
+            Gdk.KEY_Page_Down: page, Gdk.KEY_Page_Up: -page,
+        }
+        if event.keyval in moves:
+            self.set_cursor(self.cursor + moves[event.keyval])
+            return True
+        if event.keyval == Gdk.KEY_Home:
+            self.set_cursor(0)
+            return True
+        if event.keyval == Gdk.KEY_End:
+            self.set_cursor(len(self.items) - 1)
+            return True
+        if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
+            if self.on_activate and 0 <= self.cursor < len(self.items):
+                self.on_activate(self.items[self.cursor])
+            return True
+        return False
@@ -1,26 +1,48 @@
 #!/usr/bin/env python3
 """Tech HUD App Launcher — GTK3 + Layer Shell"""
 
-import gi
-import subprocess
 import os
+import sys
+import time
+
+STARTED = time.monotonic()
+
+# Thin client: if hud-host.py is running, hand it the toggle and skip GTK
+if __name__ == "__main__":
+    import hud_host
+    if hud_host.forward("launcher"):
+        sys.exit(0)
+
+import gi
 import signal
-import configparser
 import json
+import hashlib
+import shutil
+from collections import OrderedDict
 
 gi.require_version("Gtk", "3.0")
 gi.require_version("GtkLayerShell", "0.1")
-from gi.repository import Gtk, Gdk, GtkLayerShell, GLib, Pango
+from gi.repository import Gtk, Gdk, GdkPixbuf, GtkLayerShell, GLib, Pango
+
+from app_launch import LaunchError, launch
+from hud_ipc import IPCError
+from hud_profile import Profiler
+from hud_vlist import VirtualList, set_class
+from launcher_entries import load_desktop_entries
+from launcher_running import ClientTable
+from launcher_search import Frecency, SearchIndex
+
+IMPORTED = time.monotonic()
 
 CSS_FILE = os.path.expanduser("~/.config/waybar/scripts/launcher-ui.css")
 PID_FILE = "/tmp/launcher-ui.pid"
 PINS_FILE = os.path.expanduser("~/.cache/launcher-pins.json")
-
-APP_DIRS = [
-    "/usr/share/applications",
-    os.path.expanduser("~/.local/share/applications"),
-    "/usr/local/share/applications",
-]
+ICON_CACHE_DIR = os.path.expanduser("~/.cache/launcher-icons")
+ICON_SIZE = 22
+ICON_LRU_SIZE = 512
+# Focus an app's open window instead of starting another (Shift forces a
+# new instance); HUD_LAUNCHER_FOCUS=0 always launches
+FOCUS_RUNNING = os.environ.get("HUD_LAUNCHER_FOCUS", "1") != "0"
 
 
 def load_pins():
@@ -37,65 +59,112 @@ def save_pins(pins):
         json.dump(pins, f)
 
 
-def load_desktop_entries():
-    apps = []
-    seen = set()
+class IconCache:
+    """Two-level cache of ready ICON_SIZE pixbufs.
 
-    for app_dir in APP_DIRS:
-        if not os.path.isdir(app_dir):
-            continue
-        for fname in os.listdir(app_dir):
-            if not fname.endswith(".desktop") or fname in seen:
-                continue
-            seen.add(fname)
-            path = os.path.join(app_dir, fname)
+    Memory: an LRU for the life of the process (misses are cached too).
+    Disk: pre-scaled PNGs under ICON_CACHE_DIR keyed by icon name and
+    size, wiped whenever the icon theme name or its index.theme changes,
+    so a cold open decodes small PNGs instead of rasterizing SVGs.
+    """
+
+    def __init__(self, icon_theme, size=ICON_SIZE):
+        self.icon_theme = icon_theme
+        self.size = size
+        self.memory = OrderedDict()
+        self.disk_dir = self._prepare_disk_cache()
+
+    def _theme_stamp(self):
+        theme = Gtk.Settings.get_default().get_property("gtk-icon-theme-name")
+        mtime = 0
+        for base in self.icon_theme.get_search_path():
             try:
-                cp = configparser.ConfigParser(interpolation=None)
-                cp.read(path, encoding="utf-8")
-                entry = cp["Desktop Entry"]
-
-                if entry.get("NoDisplay", "false").lower() == "true":
-                    continue
-                if entry.get("Hidden", "false").lower() == "true":
-                    continue
-
-                name = entry.get("Name", "")
-                if not name:
-                    continue
-
-                icon = entry.get("Icon", "")
-                exec_cmd = entry.get("Exec", "")
-                generic = entry.get("GenericName", "")
-                keywords = entry.get("Keywords", "")
-                comment = entry.get("Comment", "")
-
-                exec_clean = exec_cmd
-                for token in ["%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N",
-                              "%i", "%c", "%k", "%v", "%m"]:
-                    exec_clean = exec_clean.replace(token, "")
-                exec_clean = exec_clean.strip()
-
-                search_str = " ".join([
-                    name, generic, keywords, comment, fname
-                ]).lower()
-
-                apps.append({
-                    "name": name,
-                    "icon": icon,
-                    "exec": exec_clean,
-                    "search": search_str,
-                    "file": fname,
-                })
-            except Exception:
+                mtime = os.stat(os.path.join(base, theme, "index.theme")).st_mtime_ns
+                break
+            except OSError:
                 continue
+        return f"{theme}:{mtime}"
 
-    apps.sort(key=lambda a: a["name"].lower())
-    return apps
+    def _prepare_disk_cache(self):
+        stamp_file = os.path.join(ICON_CACHE_DIR, "theme")
+        try:
+            stamp = self._theme_stamp()
+            try:
+                with open(stamp_file, "r") as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            if current != stamp:
+                shutil.rmtree(ICON_CACHE_DIR, ignore_errors=True)
+                os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+                with open(stamp_file, "w") as f:
+                    f.write(stamp)
+            return ICON_CACHE_DIR
+        except OSError:
+            return None
+
+    def _disk_path(self, icon_name):
+        key = icon_name
+        if os.path.isabs(icon_name):
+            try:
+                key = f"{icon_name}:{os.stat(icon_name).st_mtime_ns}"
+            except OSError:
+                pass
+        digest = hashlib.sha1(f"{key}:{self.size}".encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.png")
+
+    def _render(self, icon_name):
+        if os.path.isfile(icon_name):
+            try:
+                return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                    icon_name, self.size, self.size, True
+                )
+            except GLib.Error:
+                pass
+
+        if self.icon_theme.has_icon(icon_name):
+            try:
+                return self.icon_theme.load_icon(
+                    icon_name, self.size, Gtk.IconLookupFlags.FORCE_SIZE
+                )
+            except GLib.Error:
+                pass
+        return None
+
+    def get(self, icon_name):
+        """Return a pixbuf for icon_name, or None if it can't be resolved."""
+        if icon_name in self.memory:
+            self.memory.move_to_end(icon_name)
+            return self.memory[icon_name]
+
+        pixbuf = None
+        disk_path = self._disk_path(icon_name) if self.disk_dir else None
+        if disk_path and os.path.exists(disk_path):
+            try:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file(disk_path)
+            except GLib.Error:
+                pixbuf = None
+
+        if pixbuf is None:
+            pixbuf = self._render(icon_name)
+            if pixbuf is not None and disk_path:
+                try:
+                    pixbuf.savev(disk_path, "png", [], [])
+                except GLib.Error:
+                    pass
+
+        self.memory[icon_name] = pixbuf
+        if len(self.memory) > ICON_LRU_SIZE:
+            self.memory.popitem(last=False)
+        return pixbuf
 
 
 class AppLauncher(Gtk.Window):
-    def __init__(self):
+    def __init__(self, profiler=None, resident=False):
         super().__init__()
+        self.resident = resident
+        self.profiler = profiler or Profiler("launcher")
+        self.profiler.watch(self)
 
         GtkLayerShell.init_for_window(self)
         GtkLayerShell.set_layer(self, GtkLayerShell.Layer.OVERLAY)
@@ -111,25 +180,40 @@ class AppLauncher(Gtk.Window):
         self.set_size_request(420, 580)
         self.get_style_context().add_class("launcher-window")
 
-        self._load_css()
-        self.apps = load_desktop_entries()
+        with self.profiler.phase("css"):
+            self._load_css()
+        with self.profiler.phase("load_entries"):
+            self.apps = load_desktop_entries()
         self.pins = load_pins()
+        with self.profiler.phase("search_index"):
+            self.frecency = Frecency()
+            self.search = SearchIndex(self.apps, self.frecency)
         self.icon_theme = Gtk.IconTheme.get_default()
-        self._build_ui()
+        self.icons = IconCache(self.icon_theme)
+        with self.profiler.phase("clients"):
+            self.clients = None
+            if FOCUS_RUNNING:
+                self.clients = ClientTable()
+                self.clients.watch(self._on_clients_changed)
+        with self.profiler.phase("build_ui"):
+            self._build_ui()
         self.connect("key-press-event", self._on_key)
 
     def _load_css(self):
-        css_provider = Gtk.CssProvider()
-        try:
-            css_provider.load_from_path(CSS_FILE)
-        except GLib.Error:
-            pass
+        self.css_provider = Gtk.CssProvider()
+        self.reload_css()
         Gtk.StyleContext.add_provider_for_screen(
             Gdk.Screen.get_default(),
-            css_provider,
+            self.css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
 
+    def reload_css(self):
+        try:
+            self.css_provider.load_from_path(CSS_FILE)
+        except GLib.Error:
+            pass
+
     def _build_ui(self):
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         main_box.get_style_context().add_class("main-box")
@@ -144,9 +228,9 @@ class AppLauncher(Gtk.Window):
         title.set_halign(Gtk.Align.START)
         header.pack_start(title, True, True, 0)
 
-        count = Gtk.Label(label=f"{len(self.apps)}")
-        count.get_style_context().add_class("lnc-count")
-        header.pack_end(count, False, False, 0)
+        self.count_label = Gtk.Label(label=f"{len(self.apps)}")
+        self.count_label.get_style_context().add_class("lnc-count")
+        header.pack_end(self.count_label, False, False, 0)
 
         main_box.pack_start(header, False, False, 0)
 
@@ -157,156 +241,181 @@ class AppLauncher(Gtk.Window):
         self.search_entry.connect("changed", self._on_search_changed)
         main_box.pack_start(self.search_entry, False, False, 0)
 
-        # Scrollable list
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
-
-        self.list_box = Gtk.ListBox()
-        self.list_box.get_style_context().add_class("lnc-list")
-        self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
-        scroll.add(self.list_box)
-        main_box.pack_start(scroll, True, True, 0)
+        # Only the rows on screen exist; they are rebound while scrolling.
+        # Items are (app, is_pinned), or (None, label) for a section label
+        self.list_view = VirtualList(self._make_row, self._bind_row, self._activate)
+        self.list_view.get_style_context().add_class("lnc-list")
+        main_box.pack_start(self.list_view, True, True, 0)
 
+        self._scores = None
         self._populate()
 
         # Don't auto-focus search
         self.search_entry.set_can_focus(True)
-        self.list_box.set_can_focus(True)
-        GLib.idle_add(lambda: self.list_box.grab_focus())
-
-    def _populate(self, filter_text=""):
-        for child in self.list_box.get_children():
-            self.list_box.remove(child)
-
-        ft = filter_text.lower()
-        pinned = [a for a in self.apps if a["file"] in self.pins]
-        unpinned = [a for a in self.apps if a["file"] not in self.pins]
-
+        GLib.idle_add(lambda: self.list_view.grab_focus())
+
+    def _populate(self, keep_scroll=False):
+        # Pinned apps first, then the rest by rank (searching) or name
+        apps = self.apps
+        if self._scores is not None:
+            scores = self._scores
+            apps = sorted(
+                (a for a in apps if a["file"] in scores),
+                key=lambda a: (-scores[a["file"]], a["name"].lower()),
+            )
+        pinned = [a for a in apps if a["file"] in self.pins]
+        items = []
         if pinned:
-            self._add_section_label("  PINNED")
-            for app in pinned:
-                if ft and ft not in app["search"]:
-                    continue
-                self.list_box.add(self._make_row(app, True))
-
-        self._add_section_label("  ALL APPS")
-        for app in unpinned:
-            if ft and ft not in app["search"]:
-                continue
-            self.list_box.add(self._make_row(app, False))
-
-        self.list_box.show_all()
-
-    def _add_section_label(self, text):
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-        row.set_activatable(False)
-        lbl = Gtk.Label(label=text)
-        lbl.get_style_context().add_class("lnc-section")
-        lbl.set_halign(Gtk.Align.START)
-        row.add(lbl)
-        self.list_box.add(row)
+            items.append((None, "  PINNED"))
+            items.extend((app, True) for app in pinned)
+        items.append((None, "  ALL APPS"))
+        items.extend((app, False) for app in apps if app["file"] not in self.pins)
+
+        if keep_scroll:
+            self.list_view.items = items
+            self.list_view.changed()
+        else:
+            self.list_view.set_items(items)
+        self.profiler.mark("populated")
 
-    def _make_row(self, app, is_pinned):
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-        row.set_activatable(False)
+    def reload_apps(self):
+        """Re-read the app directories (through the index) and rebuild the list."""
+        self.apps = load_desktop_entries()
+        self.search = SearchIndex(self.apps, self.frecency)
+        self.count_label.set_text(f"{len(self.apps)}")
+        self._on_search_changed(self.search_entry)
+
+    def _make_row(self):
+        # One pooled row serves both section labels and apps; buttons act
+        # on whatever item the row is bound to at click time
+        row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+
+        row.label = Gtk.Label()
+        row.label.get_style_context().add_class("lnc-section")
+        row.label.set_halign(Gtk.Align.START)
+        row.label.set_valign(Gtk.Align.END)
+        row.label.set_vexpand(True)
+        row.pack_start(row.label, True, True, 0)
 
         outer = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
         outer.get_style_context().add_class("lnc-entry")
-        if is_pinned:
-            outer.get_style_context().add_class("pinned")
+        row.outer = outer
+        row.pack_start(outer, True, True, 0)
 
         # Launch button (main area)
         btn = Gtk.Button()
         btn.get_style_context().add_class("lnc-btn")
         btn.set_relief(Gtk.ReliefStyle.NONE)
-        btn.connect("clicked", lambda b, a=app: self._launch(a))
+        btn.connect("clicked", lambda b: self._activate(row.item))
         btn.set_hexpand(True)
 
         box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         box.get_style_context().add_class("lnc-row")
 
-        icon_widget = self._get_icon(app["icon"])
-        box.pack_start(icon_widget, False, False, 4)
-
-        name_label = Gtk.Label(label=app["name"])
-        name_label.get_style_context().add_class("lnc-name")
-        name_label.set_halign(Gtk.Align.START)
-        name_label.set_ellipsize(Pango.EllipsizeMode.END)
-        name_label.set_max_width_chars(30)
-        box.pack_start(name_label, True, True, 0)
+        row.icon = Gtk.Image()
+        row.icon.get_style_context().add_class("lnc-icon")
+        box.pack_start(row.icon, False, False, 4)
+        row.fallback = Gtk.Label(label="󰣆")
+        row.fallback.get_style_context().add_class("lnc-icon-fallback")
+        box.pack_start(row.fallback, False, False, 4)
+
+        row.name = Gtk.Label()
+        row.name.get_style_context().add_class("lnc-name")
+        row.name.set_halign(Gtk.Align.START)
+        row.name.set_ellipsize(Pango.EllipsizeMode.END)
+        row.name.set_max_width_chars(30)
+        box.pack_start(row.name, True, True, 0)
+
+        row.running = Gtk.Label(label="●")
+        row.running.get_style_context().add_class("lnc-running")
+        row.running.set_tooltip_text("Running: opens its window (Shift for a new one)")
+        box.pack_end(row.running, False, False, 4)
 
         btn.add(box)
         outer.pack_start(btn, True, True, 0)
 
         # Pin button
-        pin_btn = Gtk.Button(label="󰤱" if is_pinned else "󰤰")
-        pin_btn.get_style_context().add_class("lnc-pin-active" if is_pinned else "lnc-pin")
-        pin_btn.set_relief(Gtk.ReliefStyle.NONE)
-        pin_btn.set_tooltip_text("Unpin" if is_pinned else "Pin")
-        pin_btn.connect("clicked", lambda b, a=app, p=is_pinned: self._on_pin(a, p))
-        outer.pack_end(pin_btn, False, False, 0)
-
-        row.add(outer)
+        row.pin_btn = Gtk.Button()
+        row.pin_btn.set_relief(Gtk.ReliefStyle.NONE)
+        row.pin_btn.connect("clicked", lambda b: self._on_pin(row.item[0]))
+        outer.pack_end(row.pin_btn, False, False, 0)
         return row
 
-    def _on_pin(self, app, is_pinned):
+    def _bind_row(self, row, item):
+        app, extra = item
+        row.label.set_visible(app is None)
+        row.outer.set_visible(app is not None)
+        if app is None:
+            row.label.set_text(extra)
+            return
+
+        pixbuf = self.icons.get(app["icon"]) if app["icon"] else None
+        if pixbuf is not None:
+            row.icon.set_from_pixbuf(pixbuf)
+        row.icon.set_visible(pixbuf is not None)
+        row.fallback.set_visible(pixbuf is None)
+        row.name.set_text(app["name"])
+        row.running.set_visible(self.clients is not None and self.clients.is_running(app))
+        self._update_pin_state(row, extra)
+
+    def _update_pin_state(self, row, is_pinned):
+        set_class(row.outer, "pinned", is_pinned)
+        pin_ctx = row.pin_btn.get_style_context()
         if is_pinned:
+            pin_ctx.remove_class("lnc-pin")
+            pin_ctx.add_class("lnc-pin-active")
+        else:
+            pin_ctx.remove_class("lnc-pin-active")
+            pin_ctx.add_class("lnc-pin")
+        row.pin_btn.set_label("󰤱" if is_pinned else "󰤰")
+        row.pin_btn.set_tooltip_text("Unpin" if is_pinned else "Pin")
+
+    def _on_pin(self, app):
+        if app["file"] in self.pins:
             self.pins.remove(app["file"])
         else:
             self.pins.append(app["file"])
         save_pins(self.pins)
-        self._populate(self.search_entry.get_text())
-
-    def _get_icon(self, icon_name):
-        ICON_SIZE = 22
+        self._populate(keep_scroll=True)
 
-        if not icon_name:
-            label = Gtk.Label(label="󰣆")
-            label.get_style_context().add_class("lnc-icon-fallback")
-            return label
+    def _on_clients_changed(self):
+        if self.get_visible():
+            self.list_view.refresh()
 
-        if os.path.isfile(icon_name):
-            try:
-                from gi.repository import GdkPixbuf
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    icon_name, ICON_SIZE, ICON_SIZE, True
-                )
-                img = Gtk.Image.new_from_pixbuf(pixbuf)
-                img.get_style_context().add_class("lnc-icon")
-                return img
-            except Exception:
-                pass
-
-        if self.icon_theme.has_icon(icon_name):
-            try:
-                pixbuf = self.icon_theme.load_icon(
-                    icon_name, ICON_SIZE, Gtk.IconLookupFlags.FORCE_SIZE
-                )
-                img = Gtk.Image.new_from_pixbuf(pixbuf)
-                img.get_style_context().add_class("lnc-icon")
-                return img
-            except Exception:
-                pass
-
-        label = Gtk.Label(label="󰣆")
-        label.get_style_context().add_class("lnc-icon-fallback")
-        return label
-
-    def _launch(self, app):
+    def _activate(self, item):
+        if item[0] is None:
+            return
+        # Shift+click / Shift+Enter starts a new instance
+        ok, state = Gtk.get_current_event_state()
+        force_new = ok and bool(state & Gdk.ModifierType.SHIFT_MASK)
+        self._launch(item[0], force_new)
+
+    def _launch(self, app, force_new=False):
+        started = time.monotonic()
+        self.frecency.record(app["file"])
+        # Close first so the popup is gone before process creation starts
         self._quit()
-        subprocess.Popen(
-            app["exec"],
-            shell=True,
-            start_new_session=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        Gdk.Display.get_default().flush()
+        address = None
+        if self.clients is not None and not force_new:
+            address = self.clients.find(app)
+        if address is not None:
+            try:
+                self.clients.focus(address)
+                return
+            except IPCError as e:
+                print(f"launcher: {app['file']}: {e}", file=sys.stderr)
+        try:
+            launch(app, started)
+        except LaunchError as e:
+            print(f"launcher: {app['file']}: {e}", file=sys.stderr)
 
     def _on_search_changed(self, entry):
-        self._populate(entry.get_text())
+        t = time.monotonic()
+        text = entry.get_text()
+        self._scores = self.search.scores(text) if text.strip() else None
+        self._populate()
+        self.profiler.sample("keystroke_ms", (time.monotonic() - t) * 1000)
 
     def _on_key(self, widget, event):
         if event.keyval == Gdk.KEY_Escape:
@@ -314,7 +423,22 @@ class AppLauncher(Gtk.Window):
             return True
         return False
 
+    def popup(self):
+        self.profiler.restart(self)
+        # Running markers may have changed while hidden
+        self.list_view.refresh()
+        self.show_all()
+        self.present()
+        self.list_view.grab_focus()
+
     def _quit(self):
+        if self.resident:
+            # Hosted by hud-host.py: keep rows and caches, just hide
+            self.hide()
+            self.search_entry.set_text("")
+            self.profiler.flush(resident=True)
+            return
+        self.profiler.flush()
         try:
             os.remove(PID_FILE)
         except FileNotFoundError:
@@ -324,6 +448,8 @@ class AppLauncher(Gtk.Window):
 
 
 def main():
+    profiler = Profiler("launcher", start=STARTED)
+    profiler.record("imports", STARTED, IMPORTED)
     if os.path.exists(PID_FILE):
         try:
             old_pid = int(open(PID_FILE).read().strip())
@@ -340,6 +466,7 @@ def main():
         f.write(str(os.getpid()))
 
     def on_sigterm(*args):
+        profiler.flush()
         try:
             os.remove(PID_FILE)
         except FileNotFoundError:
@@ -348,7 +475,7 @@ def main():
 
     signal.signal(signal.SIGTERM, on_sigterm)
 
-    win = AppLauncher()
+    win = AppLauncher(profiler)
     win.show_all()
     Gtk.main()
 
@@ -0,0 +1,212 @@
+"""Tech HUD App Launcher — .desktop entries through a cached index (GTK-free)"""
+
+import marshal
+import os
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+
+from app_launch import tryexec_ok
+from desktop_entry import is_true, parse_exec, read_desktop_entry, unescape
+
+INDEX_FILE = os.path.expanduser("~/.cache/launcher-index.bin")
+INDEX_VERSION = 5
+SCAN_WORKERS = 4
+
+APP_DIRS = [
+    "/usr/share/applications",
+    os.path.expanduser("~/.local/share/applications"),
+    "/usr/local/share/applications",
+]
+
+
+def parse_desktop_file(path, fname):
+    """Parse one .desktop file into a launcher record, or None if hidden."""
+    entry = read_desktop_entry(path)
+    if entry is None:
+        return None
+
+    if is_true(entry.get("NoDisplay")) or is_true(entry.get("Hidden")):
+        return None
+
+    name = unescape(entry.get("Name", ""))
+    if not name:
+        return None
+
+    icon = unescape(entry.get("Icon", ""))
+    generic = unescape(entry.get("GenericName", ""))
+    keywords = unescape(entry.get("Keywords", ""))
+    comment = unescape(entry.get("Comment", ""))
+    argv = parse_exec(entry.get("Exec", ""), icon, name, path)
+
+    search_str = " ".join([
+        name, generic, keywords, comment, fname
+    ]).lower()
+
+    return {
+        "name": name,
+        "icon": icon,
+        "exec": shlex.join(argv),
+        "argv": argv,
+        "path": unescape(entry.get("Path", "")),
+        "terminal": is_true(entry.get("Terminal")),
+        "tryexec": unescape(entry.get("TryExec", "")),
+        "wmclass": unescape(entry.get("StartupWMClass", "")),
+        "search": search_str,
+        "file": fname,
+        "generic": generic,
+        "keywords": keywords,
+        "comment": comment,
+    }
+
+
+def load_index():
+    """Read the cached desktop index, or an empty one if missing/corrupt.
+
+    Layout: {"version", "dirs": {dir: [mtime_ns, [fname, ...]]},
+    "files": {path: [mtime_ns, size, record_or_None]}}. marshal keeps
+    it compact and loads much faster than re-reading every file.
+    """
+    empty = {"version": INDEX_VERSION, "dirs": {}, "files": {}}
+    try:
+        with open(INDEX_FILE, "rb") as f:
+            # loads() on one read: load() on a file object is ~10x slower
+            index = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return empty
+    if (
+        not isinstance(index, dict)
+        or index.get("version") != INDEX_VERSION
+        or not isinstance(index.get("dirs"), dict)
+        or not isinstance(index.get("files"), dict)
+    ):
+        return empty
+    return index
+
+
+def save_index(index):
+    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+    tmp = f"{INDEX_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(marshal.dumps(index))
+        os.replace(tmp, INDEX_FILE)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+
+
+def _list_app_dir(app_dir, cached_dirs):
+    """Return (mtime_ns, fnames) for app_dir, reusing the cached listing
+    when the directory itself hasn't changed."""
+    try:
+        mtime = os.stat(app_dir).st_mtime_ns
+    except OSError:
+        return None
+    cached = cached_dirs.get(app_dir)
+    if cached and cached[0] == mtime:
+        return cached[0], cached[1]
+    try:
+        fnames = sorted(
+            f for f in os.listdir(app_dir) if f.endswith(".desktop")
+        )
+    except OSError:
+        return None
+    return mtime, fnames
+
+
+def load_desktop_entries():
+    index = load_index()
+    try:
+        apps, new_index, dirty = _load_with_index(index)
+    except Exception:
+        # Malformed cache contents — fall back to a full rescan
+        apps, new_index, dirty = _load_with_index(
+            {"version": INDEX_VERSION, "dirs": {}, "files": {}}
+        )
+    if dirty:
+        save_index(new_index)
+    # TryExec is checked on every load: the binary can come and go
+    # without the .desktop file changing
+    return [a for a in apps if tryexec_ok(a["tryexec"])]
+
+
+def _scan_app_dir(app_dir, cached_dirs):
+    """List app_dir and stat its .desktop files: (listing, {fname: stat})."""
+    listing = _list_app_dir(app_dir, cached_dirs)
+    if listing is None:
+        return None
+    stats = {}
+    for fname in listing[1]:
+        try:
+            stats[fname] = os.stat(os.path.join(app_dir, fname))
+        except OSError:
+            continue
+    return listing, stats
+
+
+def _load_with_index(index):
+    cached_dirs = index["dirs"]
+    cached_files = index["files"]
+    new_index = {"version": INDEX_VERSION, "dirs": {}, "files": {}}
+    dirty = False
+    seen = set()
+    winners = []
+    stale = []
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        scans = list(pool.map(
+            lambda d: _scan_app_dir(d, cached_dirs), APP_DIRS
+        ))
+
+        # First directory to provide a filename wins
+        for app_dir, scan in zip(APP_DIRS, scans):
+            if scan is None:
+                if app_dir in cached_dirs:
+                    dirty = True
+                continue
+            listing, stats = scan
+            new_index["dirs"][app_dir] = [listing[0], listing[1]]
+            if cached_dirs.get(app_dir) != new_index["dirs"][app_dir]:
+                dirty = True
+
+            for fname in listing[1]:
+                if fname in seen:
+                    continue
+                seen.add(fname)
+                st = stats.get(fname)
+                if st is None:
+                    dirty = True
+                    continue
+                path = os.path.join(app_dir, fname)
+                cached = cached_files.get(path)
+                if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    record = cached[2]
+                else:
+                    record = None
+                    stale.append((path, fname))
+                winners.append((path, st, record))
+
+        if stale:
+            dirty = True
+            parsed = dict(zip(
+                (path for path, _ in stale),
+                pool.map(lambda item: parse_desktop_file(*item), stale),
+            ))
+        else:
+            parsed = {}
+
+    apps = []
+    for path, st, record in winners:
+        if path in parsed:
+            record = parsed[path]
+        new_index["files"][path] = [st.st_mtime_ns, st.st_size, record]
+        if record is not None:
+            apps.append(dict(record))
+
+    if len(new_index["files"]) != len(cached_files):
+        dirty = True
+
+    apps.sort(key=lambda a: a["name"].lower())
+    return apps, new_index, dirty
@@ -0,0 +1,175 @@
+"""Tech HUD App Launcher — running apps, from a Hyprland client table
+
+The table is read once over IPC and then kept current from the event
+socket, so checking whether an app is running (for every row bound, and
+for every click) never talks to the compositor.
+"""
+
+from hud_ipc import IPCError, hyprland
+
+# Reconnects after the event socket closes (a compositor restart), then
+# the table stays empty
+RECONNECT_S = 2
+RECONNECT_TRIES = 5
+
+
+def app_keys(app):
+    """Lowercased window classes an app's windows may carry: its
+    StartupWMClass, its desktop file ID, and the last part of a reverse-DNS
+    ID (org.gnome.Nautilus -> nautilus)."""
+    if app.get("terminal"):
+        # Runs inside whatever terminal opens it
+        return set()
+    keys = set()
+    if app.get("wmclass"):
+        keys.add(app["wmclass"].lower())
+    file_id = app["file"].removesuffix(".desktop").lower()
+    keys.add(file_id)
+    if "." in file_id:
+        keys.add(file_id.rsplit(".", 1)[1])
+    return keys
+
+
+class ClientTable:
+    """Mapped Hyprland windows: address (no 0x) -> [class, focus order].
+
+    connect(), then call read() whenever fileno() is readable, or let
+    watch() do both from the GLib main loop. Without Hyprland the table
+    stays empty and nothing counts as running.
+    """
+
+    def __init__(self, hypr=None):
+        self.hypr = hypr
+        self.clients = {}
+        self.classes = {}
+        self.events = None
+        self.focus_seq = 0
+        self.on_change = None
+        self.watch_id = None
+        self.retries = 0
+
+    def _hypr(self):
+        return self.hypr or hyprland()
+
+    def connect(self):
+        """Load the table; False (and an empty table) without Hyprland."""
+        try:
+            hypr = self._hypr()
+            # Listening before listing, so no window goes unseen
+            self.events = hypr.events()
+            clients = hypr.json("clients")
+        except IPCError:
+            self.disconnect()
+            return False
+        self.clients = {}
+        # focusHistoryID 0 is the most recently focused window
+        for client in clients:
+            if client.get("mapped", True):
+                address = client["address"].removeprefix("0x")
+                self.clients[address] = [
+                    (client.get("class") or client.get("initialClass") or "").lower(),
+                    -client.get("focusHistoryID", 0),
+                ]
+        self._index()
+        return True
+
+    def disconnect(self):
+        if self.events is not None:
+            self.events.close()
+            self.events = None
+        self.clients = {}
+        self._index()
+
+    def _index(self):
+        classes = {}
+        for address, (wm_class, _) in self.clients.items():
+            classes.setdefault(wm_class, []).append(address)
+        self.classes = classes
+
+    def fileno(self):
+        return self.events.fileno()
+
+    def read(self):
+        """Apply pending events; True if a window opened or closed.
+        Raises IPCError (with the table emptied) once the socket closes."""
+        try:
+            events = self.events.read()
+        except IPCError:
+            self.disconnect()
+            raise
+        changed = False
+        for event, data in events:
+            if event == "openwindow":
+                # ADDRESS,WORKSPACE,CLASS,TITLE
+                fields = data.split(",", 3)
+                if len(fields) >= 3:
+                    self.focus_seq += 1
+                    self.clients[fields[0]] = [fields[2].lower(), self.focus_seq]
+                    changed = True
+            elif event == "closewindow":
+                changed |= self.clients.pop(data, None) is not None
+            elif event == "activewindowv2" and data in self.clients:
+                self.focus_seq += 1
+                self.clients[data][1] = self.focus_seq
+        if changed:
+            self._index()
+        return changed
+
+    # -- GLib main loop ---------------------------------------------------
+
+    def watch(self, on_change=None):
+        """Connect and follow events from the GLib main loop; on_change()
+        runs whenever a window opens or closes."""
+        self.on_change = on_change
+        if self.connect():
+            self._add_watch()
+
+    def _add_watch(self):
+        from gi.repository import GLib
+
+        self.watch_id = GLib.io_add_watch(
+            self.fileno(), GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR, self._on_events,
+        )
+
+    def _on_events(self, fd, condition):
+        from gi.repository import GLib
+
+        try:
+            changed = self.read()
+        except IPCError:
+            self.watch_id = None
+            self.retries = RECONNECT_TRIES
+            GLib.timeout_add_seconds(RECONNECT_S, self._reconnect)
+            self._notify()
+            return False
+        if changed:
+            self._notify()
+        return True
+
+    def _reconnect(self):
+        if self.connect():
+            self._add_watch()
+            self._notify()
+            return False
+        self.retries -= 1
+        return self.retries > 0
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change()
+
+    # -- lookups ----------------------------------------------------------
+
+    def is_running(self, app):
+        return any(key in self.classes for key in app_keys(app))
+
+    def find(self, app):
+        """Address of the app's most recently focused window, or None."""
+        addresses = [a for key in app_keys(app) for a in self.classes.get(key, ())]
+        if not addresses:
+            return None
+        return max(addresses, key=lambda a: self.clients[a][1])
+
+    def focus(self, address):
+        self._hypr().dispatch("focuswindow", f"address:0x{address}")
@@ -0,0 +1,273 @@
+"""Tech HUD App Launcher — ranked fuzzy search with frecency (GTK-free)"""
+
+import bisect
+import json
+import os
+import re
+import time
+from itertools import compress, repeat
+from operator import contains
+
+FRECENCY_FILE = os.path.expanduser("~/.cache/launcher-frecency.json")
+
+# Match-quality tiers; frecency adds at most FRECENCY_MAX on top
+SCORE_EXACT = 1000
+SCORE_NAME_PREFIX = 900
+SCORE_WORD_PREFIX = 800
+SCORE_NAME_SUBSTR = 700
+SCORE_INITIALS = 650
+SCORE_ALT_SUBSTR = 500
+SCORE_COMMENT_SUBSTR = 350
+SCORE_NAME_FUZZY = 300
+SCORE_ALT_FUZZY = 150
+FRECENCY_MAX = 150
+
+WORD_SEPARATORS = " -_.;:/"
+
+# (max age in days, weight) — older launches count for less
+RECENCY_BUCKETS = [(4, 100), (14, 70), (31, 50), (90, 30)]
+RECENCY_FLOOR = 10
+
+
+def _words(text):
+    for sep in WORD_SEPARATORS[1:]:
+        text = text.replace(sep, " ")
+    return text.split()
+
+
+def _prefix_ids(keys, q):
+    """Ids of every (key, id) in sorted keys whose key starts with q."""
+    j = bisect.bisect_left(keys, (q,))
+    k = bisect.bisect_left(keys, (q + "\U0010ffff",), j)
+    return [i for _, i in keys[j:k]]
+
+
+def _fuzzy_pattern(q, stop="\n"):
+    # "fox" -> f[^\no]*o[^\nx]*x : leftmost in-order match that does not
+    # cross a `stop` character, without the backtracking a lazy .*? would do
+    parts = [re.escape(q[0])]
+    for ch in q[1:]:
+        parts.append("[^%s%s]*%s" % (re.escape(stop), re.escape(ch), re.escape(ch)))
+    return re.compile("".join(parts))
+
+
+def _grams(q):
+    """The query's trigrams (bigram for two characters)."""
+    n = 3 if len(q) > 2 else 2
+    return {q[j:j + n] for j in range(len(q) - n + 1)}
+
+
+def _intersect(sets):
+    """A new set: the intersection of the sets, smallest first."""
+    sets = sorted(sets, key=len)
+    if not sets:
+        return set()
+    return sets[0].intersection(*sets[1:])
+
+
+class Frecency:
+    """Launch counts with recency weighting, persisted as JSON."""
+
+    def __init__(self, path=FRECENCY_FILE):
+        self.path = path
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+
+    def record(self, key, now=None):
+        now = time.time() if now is None else now
+        item = self.data.get(key) or {"count": 0, "last": 0}
+        item["count"] = item.get("count", 0) + 1
+        item["last"] = now
+        self.data[key] = item
+        try:
+            self.save()
+        except OSError:
+            pass
+
+    def value(self, key, now=None):
+        item = self.data.get(key)
+        if not item:
+            return 0.0
+        now = time.time() if now is None else now
+        age_days = max(0.0, now - item.get("last", 0)) / 86400
+        weight = RECENCY_FLOOR
+        for max_age, bucket_weight in RECENCY_BUCKETS:
+            if age_days <= max_age:
+                weight = bucket_weight
+                break
+        return item.get("count", 0) * weight
+
+    def bonus(self, key, now=None):
+        # Saturating curve so one hugely popular app can't drown out
+        # a clearly better text match
+        f = self.value(key, now)
+        return FRECENCY_MAX * f / (f + 200) if f else 0.0
+
+
+class SearchIndex:
+    """Prebuilt search index over launcher records.
+
+    Names, name words and initials are kept in sorted key lists, so the
+    prefix tiers are a bisect. Substring tiers only check the records that
+    hold every trigram of the query, and the fuzzy tiers those whose name
+    or alt text holds every character of it; a query that extends the
+    previous one only checks the previous hits. The id set for a trigram or
+    character is found by one C-level pass over all records the first time
+    a query needs it and cached, so building the index stays cheap.
+    """
+
+    def __init__(self, apps, frecency=None):
+        self.frecency = frecency
+        self.files = []
+        self.names = []
+        self.alts = []
+        self.comments = []
+        name_keys = []
+        word_keys = []
+        initials_keys = []
+        # Haystack for the trigram id sets; names and alts serve for the
+        # character ones. Each cache maps a piece to the ids containing it
+        self._texts = []
+        self._gram_ids = {}
+        self._name_chars = {}
+        self._alt_chars = {}
+
+        for i, app in enumerate(apps):
+            name = app["name"].lower()
+            stem = app["file"].rsplit(".desktop", 1)[0].lower()
+            alt = " ".join([
+                app.get("generic", ""),
+                app.get("keywords", "").replace(";", " "),
+                stem,
+            ]).lower()
+            self.files.append(app["file"])
+            self.names.append(name)
+            self.alts.append(alt)
+            comment = app.get("comment", "").lower()
+            self.comments.append(comment)
+            self._texts.append("\n".join((name, alt, comment)))
+
+            words = _words(name)
+            name_keys.append((name, i))
+            word_keys.extend((w, i) for w in words[1:])
+            if len(words) > 1:
+                initials_keys.append(("".join(w[0] for w in words), i))
+
+        self._name_keys = sorted(name_keys)
+        self._word_keys = sorted(word_keys)
+        self._initials_keys = sorted(initials_keys)
+        self._last_query = None
+        self._last_ids = None
+
+    def _ids_containing(self, piece, texts, cache):
+        ids = cache.get(piece)
+        if ids is None:
+            ids = cache[piece] = set(
+                compress(range(len(texts)), map(contains, texts, repeat(piece)))
+            )
+        return ids
+
+    def _ranked(self, q):
+        ranked = {}
+        for i in _prefix_ids(self._name_keys, q):
+            ranked[i] = SCORE_EXACT if self.names[i] == q else SCORE_NAME_PREFIX
+        for i in _prefix_ids(self._word_keys, q):
+            ranked.setdefault(i, SCORE_WORD_PREFIX)
+
+        # Single characters only match on prefixes — anything looser
+        # would light up most of the list
+        if len(q) < 2:
+            return ranked
+
+        last = self._last_query
+        # Only a query that ran every tier has hits covering all of q's
+        narrowed = last and len(last) > 2 and q.startswith(last)
+
+        # Every substring match holds all of the query's trigrams
+        sets = [self._ids_containing(g, self._texts, self._gram_ids) for g in _grams(q)]
+        if narrowed:
+            # Everything matching "fire" also matched "fir"
+            sets.append(self._last_ids)
+        for i in _intersect(sets):
+            if i in ranked:
+                continue
+            if q in self.names[i]:
+                ranked[i] = SCORE_NAME_SUBSTR
+            elif q in self.alts[i]:
+                ranked[i] = SCORE_ALT_SUBSTR
+            elif q in self.comments[i]:
+                ranked[i] = SCORE_COMMENT_SUBSTR
+        for i in _prefix_ids(self._initials_keys, q):
+            if ranked.get(i, 0) < SCORE_INITIALS:
+                ranked[i] = SCORE_INITIALS
+
+        # Every fuzzy match holds all of the query's characters. Two in
+        # order are in most alt texts, so two-character queries ("ff" for
+        # Firefox) only match names fuzzily
+        chars = set(q) - {" "}
+        tiers = [(self.names, self._name_chars, SCORE_NAME_FUZZY, _fuzzy_pattern(q))]
+        if len(q) > 2:
+            # Alt text is a bag of keywords: a match spanning two says nothing
+            tiers.append(
+                (self.alts, self._alt_chars, SCORE_ALT_FUZZY, _fuzzy_pattern(q, "\n "))
+            )
+        for fields, cache, tier, fuzzy in tiers:
+            sets = [self._ids_containing(ch, fields, cache) for ch in chars]
+            if narrowed:
+                sets.append(self._last_ids)
+            candidates = _intersect(sets)
+            candidates.difference_update(ranked)
+            for i in candidates:
+                field = fields[i]
+                m = fuzzy.search(field)
+                if m is None:
+                    continue
+                # Tighter matches and matches starting a word rank higher
+                start = m.start()
+                gaps = m.end() - start - len(q)
+                word_start = start == 0 or field[start - 1] in WORD_SEPARATORS
+                ranked[i] = tier + 20 - min(gaps, 20) + (10 if word_start else 0)
+        return ranked
+
+    def scores(self, query, now=None):
+        """Return {file: score} for every record matching query."""
+        q = query.strip().lower()
+        if not q:
+            self._last_query = None
+            return {}
+
+        ranked = self._ranked(q)
+        self._last_query = q
+        self._last_ids = set(ranked)
+
+        result = {self.files[i]: score for i, score in ranked.items()}
+        if self.frecency is not None:
+            now = time.time() if now is None else now
+            for key in self.frecency.data:
+                if key in result:
+                    result[key] += self.frecency.bonus(key, now)
+        return result
+
+    def search(self, query, limit=None, now=None):
+        """Return [(score, file)] best first."""
+        ranked = sorted(
+            ((score, f) for f, score in self.scores(query, now).items()),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return ranked[:limit] if limit else ranked
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tech HUD — notification badge for waybar, driven by swaync's D-Bus signals
+
+Runs for the life of the bar and prints one JSON line whenever the unread
+count or Do Not Disturb state changes; nothing is polled. While swaync is
+not running the badge shows no notifications, and it picks up the state
+again as soon as swaync (re)starts.
+"""
+
+import json
+import sys
+
+from gi.repository import Gio, GLib
+
+BUS_NAME = "org.erikreider.swaync.cc"
+OBJECT_PATH = "/org/erikreider/swaync/cc"
+INTERFACE = "org.erikreider.swaync.cc"
+# Both carry (count, dnd, ...) first; SubscribeV2 replaced Subscribe in
+# newer swaync, which still emits both
+SIGNALS = ("Subscribe", "SubscribeV2")
+
+
+def badge(count, dnd):
+    if dnd:
+        return {"text": " 󰂛 ", "class": "dnd", "tooltip": "Do Not Disturb"}
+    if count > 0:
+        return {"text": f"󰂚 {count}", "class": "unread", "tooltip": f"{count} notifications"}
+    return {"text": "󰂜", "class": "none", "tooltip": "No notifications"}
+
+
+class NotificationBadge:
+    def __init__(self, bus, loop):
+        self.bus = bus
+        self.loop = loop
+        self.last = None
+        # Matched against whichever process owns the name, so these stay
+        # valid across swaync restarts
+        for name in SIGNALS:
+            bus.signal_subscribe(
+                BUS_NAME, INTERFACE, name, OBJECT_PATH, None,
+                Gio.DBusSignalFlags.NONE, self._on_signal,
+            )
+        Gio.bus_watch_name_on_connection(
+            bus, BUS_NAME, Gio.BusNameWatcherFlags.NONE,
+            self._on_appeared, self._on_vanished,
+        )
+
+    def emit(self, count, dnd):
+        line = json.dumps(badge(count, dnd), ensure_ascii=False)
+        if line == self.last:
+            return
+        self.last = line
+        try:
+            print(line, flush=True)
+        except BrokenPipeError:
+            # waybar went away
+            self.loop.quit()
+
+    def _on_signal(self, bus, sender, path, interface, name, params):
+        count, dnd = params.unpack()[:2]
+        self.emit(count, dnd)
+
+    def _call(self, method, callback):
+        self.bus.call(
+            BUS_NAME, OBJECT_PATH, INTERFACE, method, None, None,
+            Gio.DBusCallFlags.NONE, -1, None, callback,
+        )
+
+    def _on_appeared(self, bus, name, owner):
+        # The state as of now; signals only report changes
+        self._call("GetSubscribeData", self._on_subscribe_data)
+
+    def _on_subscribe_data(self, bus, result):
+        # Unlike the signals, one struct: (dnd, cc_open, count, inhibited)
+        try:
+            (data,) = bus.call_finish(result).unpack()
+            dnd, count = bool(data[0]), int(data[2])
+        except (GLib.Error, ValueError, TypeError, IndexError):
+            # swaync before GetSubscribeData: ask for each value
+            self._call("NotificationCount", self._on_count)
+            return
+        self.emit(count, dnd)
+
+    def _on_count(self, bus, result):
+        try:
+            (count,) = bus.call_finish(result).unpack()
+        except GLib.Error:
+            return
+        self._call("GetDnd", lambda bus, result: self._on_dnd(bus, result, count))
+
+    def _on_dnd(self, bus, result, count):
+        try:
+            (dnd,) = bus.call_finish(result).unpack()
+        except GLib.Error:
+            dnd = False
+        self.emit(count, dnd)
+
+    def _on_vanished(self, bus, name):
+        self.emit(0, False)
+
+
+def main():
+    loop = GLib.MainLoop()
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+    except GLib.Error as e:
+        print(json.dumps(badge(0, False), ensure_ascii=False), flush=True)
+        print(f"notification-count: {e.message}", file=sys.stderr)
+        return 1
+    NotificationBadge(bus, loop)
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
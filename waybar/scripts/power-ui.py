@@ -1,29 +1,76 @@
 #!/usr/bin/env python3
 """Tech HUD Power Menu — GTK3 + Layer Shell"""
 
-import gi
-import subprocess
 import os
+import sys
+import time
+
+STARTED = time.monotonic()
+
+# Thin client: if hud-host.py is running, hand it the toggle and skip GTK
+if __name__ == "__main__":
+    import hud_host
+    if hud_host.forward("power"):
+        sys.exit(0)
+
+import gi
+import math
 import signal
 
 gi.require_version("Gtk", "3.0")
 gi.require_version("GtkLayerShell", "0.1")
 from gi.repository import Gtk, Gdk, GtkLayerShell, GLib
 
+from app_launch import LaunchError, spawn
+from hud_ipc import CloseWindows, IPCError, hyprland, logind
+from hud_profile import Profiler
+
+IMPORTED = time.monotonic()
+
 CSS_FILE = os.path.expanduser("~/.config/waybar/scripts/power-ui.css")
 PID_FILE = "/tmp/power-ui.pid"
+CLOSE_TIMEOUT_DEFAULT = 10.0
+CLOSE_TICK_MS = 100
+
+
+def close_timeout(value):
+    """HUD_POWER_CLOSE_TIMEOUT in seconds; the default when it is not a
+    finite number, and never negative."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return CLOSE_TIMEOUT_DEFAULT
+    if not math.isfinite(seconds):
+        return CLOSE_TIMEOUT_DEFAULT
+    return max(seconds, 0.0)
+
 
+# Seconds to wait for open windows to close before shutdown, reboot or
+# logout goes ahead anyway (0 skips asking them)
+CLOSE_TIMEOUT = close_timeout(os.environ.get("HUD_POWER_CLOSE_TIMEOUT"))
+
+# "logind" actions are Manager methods, "dispatch" ones Hyprland dispatchers;
+# "cmd" is the fallback when the bus or the socket is unreachable;
+# "close_apps" asks every window to close first
 ACTIONS = [
-    {"icon": "⏻", "label": "Shutdown", "cmd": ["systemctl", "poweroff"], "class": "shutdown"},
-    {"icon": "⟳", "label": "Reboot", "cmd": ["systemctl", "reboot"], "class": "reboot"},
-    {"icon": "⏾", "label": "Suspend", "cmd": ["systemctl", "suspend"], "class": "suspend"},
-    {"icon": "⇥", "label": "Logout", "cmd": ["hyprctl", "dispatch", "exit"], "class": "logout"},
+    {"icon": "⏻", "label": "Shutdown", "logind": "PowerOff", "close_apps": True,
+     "cmd": ["systemctl", "poweroff"], "class": "shutdown"},
+    {"icon": "⟳", "label": "Reboot", "logind": "Reboot", "close_apps": True,
+     "cmd": ["systemctl", "reboot"], "class": "reboot"},
+    {"icon": "⏾", "label": "Suspend", "logind": "Suspend",
+     "cmd": ["systemctl", "suspend"], "class": "suspend"},
+    {"icon": "⇥", "label": "Logout", "dispatch": "exit", "close_apps": True,
+     "cmd": ["hyprctl", "dispatch", "exit"], "class": "logout"},
 ]
 
 
 class PowerMenu(Gtk.Window):
-    def __init__(self):
+    def __init__(self, profiler=None, resident=False):
         super().__init__()
+        self.resident = resident
+        self.closing = None
+        self.profiler = profiler or Profiler("power")
+        self.profiler.watch(self)
 
         GtkLayerShell.init_for_window(self)
         GtkLayerShell.set_layer(self, GtkLayerShell.Layer.OVERLAY)
@@ -37,22 +84,27 @@ class PowerMenu(Gtk.Window):
         )
 
         self.get_style_context().add_class("power-window")
-        self._load_css()
-        self._build_ui()
+        with self.profiler.phase("css"):
+            self._load_css()
+        with self.profiler.phase("build_ui"):
+            self._build_ui()
         self.connect("key-press-event", self._on_key)
 
     def _load_css(self):
-        css_provider = Gtk.CssProvider()
-        try:
-            css_provider.load_from_path(CSS_FILE)
-        except GLib.Error:
-            pass
+        self.css_provider = Gtk.CssProvider()
+        self.reload_css()
         Gtk.StyleContext.add_provider_for_screen(
             Gdk.Screen.get_default(),
-            css_provider,
+            self.css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
         )
 
+    def reload_css(self):
+        try:
+            self.css_provider.load_from_path(CSS_FILE)
+        except GLib.Error:
+            pass
+
     def _build_ui(self):
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         main_box.get_style_context().add_class("main-box")
@@ -64,6 +116,31 @@ class PowerMenu(Gtk.Window):
         title.set_halign(Gtk.Align.START)
         main_box.pack_start(title, False, False, 0)
 
+        self.buttons = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        main_box.pack_start(self.buttons, False, False, 0)
+
+        # Shown instead of the buttons while apps are asked to close
+        self.status = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.status.get_style_context().add_class("close-status")
+        self.status_title = Gtk.Label(halign=Gtk.Align.START)
+        self.status_title.get_style_context().add_class("close-title")
+        self.status.pack_start(self.status_title, False, False, 0)
+        self.status_bar = Gtk.ProgressBar()
+        self.status_bar.get_style_context().add_class("close-progress")
+        self.status.pack_start(self.status_bar, False, False, 0)
+        self.status_apps = Gtk.Label(halign=Gtk.Align.START, xalign=0)
+        self.status_apps.set_line_wrap(True)
+        self.status_apps.set_max_width_chars(28)
+        self.status_apps.get_style_context().add_class("close-apps")
+        self.status.pack_start(self.status_apps, False, False, 0)
+        hint = Gtk.Label(label="ENTER  proceed now    ESC  cancel", halign=Gtk.Align.START)
+        hint.get_style_context().add_class("close-hint")
+        self.status.pack_start(hint, False, False, 0)
+        self.status.show_all()
+        self.status.set_no_show_all(True)
+        self.status.hide()
+        main_box.pack_start(self.status, False, False, 0)
+
         # Buttons
         for action in ACTIONS:
             btn = Gtk.Button()
@@ -83,20 +160,141 @@ class PowerMenu(Gtk.Window):
             box.pack_start(label, True, True, 0)
 
             btn.add(box)
-            btn.connect("clicked", lambda b, cmd=action["cmd"]: self._exec(cmd))
-            main_box.pack_start(btn, False, False, 0)
+            btn.connect("clicked", lambda b, action=action: self._exec(action))
+            self.buttons.pack_start(btn, False, False, 0)
 
-    def _exec(self, cmd):
+    def _exec(self, action):
+        if action.get("close_apps") and CLOSE_TIMEOUT > 0:
+            self._close_apps(action)
+        else:
+            self._run(action)
+
+    def _run(self, action):
         self._quit()
-        subprocess.Popen(cmd)
+        try:
+            if "logind" in action:
+                logind().call(action["logind"])
+            else:
+                hyprland().dispatch(action["dispatch"])
+            return
+        except IPCError as e:
+            print(f"power: {e}", file=sys.stderr)
+        cmd = action["cmd"]
+        try:
+            spawn(cmd)
+        except LaunchError as e:
+            print(f"power: {cmd[0]}: {e}", file=sys.stderr)
+
+    # -- closing apps ----------------------------------------------------
+
+    def _close_apps(self, action):
+        """Ask every window to close at once, then run the action when the
+        last one is gone or CLOSE_TIMEOUT runs out, whichever is first."""
+        try:
+            closer = CloseWindows(hyprland())
+        except IPCError as e:
+            print(f"power: {e}", file=sys.stderr)
+            self._run(action)
+            return
+        if not closer.pending:
+            closer.close()
+            self._run(action)
+            return
+
+        self.closing = {
+            "action": action,
+            "closer": closer,
+            "deadline": time.monotonic() + CLOSE_TIMEOUT,
+            "watch": GLib.io_add_watch(
+                closer.fileno(), GLib.PRIORITY_DEFAULT,
+                GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR, self._on_close_events,
+            ),
+            "timer": GLib.timeout_add(CLOSE_TICK_MS, self._on_close_tick),
+        }
+        self.buttons.hide()
+        self.status.show()
+        self._show_close_progress()
+
+    def _on_close_events(self, fd, condition):
+        closing = self.closing
+        if closing is None:
+            return False
+        if closing["closer"].read():
+            self._finish_closing(proceed=True)
+            return False
+        self._show_close_progress()
+        return True
+
+    def _on_close_tick(self):
+        closing = self.closing
+        if closing is None:
+            return False
+        if time.monotonic() >= closing["deadline"]:
+            names = ", ".join(closing["closer"].names())
+            print(f"power: still open after {CLOSE_TIMEOUT:g}s: {names}", file=sys.stderr)
+            self._finish_closing(proceed=True)
+            return False
+        self._show_close_progress()
+        return True
+
+    def _show_close_progress(self):
+        closing = self.closing
+        closer = closing["closer"]
+        left = max(0.0, closing["deadline"] - time.monotonic())
+        closed = closer.total - len(closer.pending)
+        self.status_title.set_text(
+            f"{closing['action']['label'].upper()}  {closed}/{closer.total} CLOSED  {left:.0f}s"
+        )
+        self.status_bar.set_fraction(closed / closer.total)
+        self.status_apps.set_text("  ".join(closer.names()))
+
+    def _finish_closing(self, proceed):
+        closing = self._stop_closing()
+        if closing is None:
+            return
+        if proceed:
+            self._run(closing["action"])
+        else:
+            self._quit()
+
+    def _stop_closing(self):
+        closing, self.closing = self.closing, None
+        if closing is None:
+            return None
+        GLib.source_remove(closing["watch"])
+        GLib.source_remove(closing["timer"])
+        closing["closer"].close()
+        self.status.hide()
+        self.buttons.show()
+        return closing
 
     def _on_key(self, widget, event):
+        if self.closing is not None:
+            if event.keyval == Gdk.KEY_Escape:
+                self._finish_closing(proceed=False)
+                return True
+            if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
+                self._finish_closing(proceed=True)
+                return True
+            return False
         if event.keyval == Gdk.KEY_Escape:
             self._quit()
             return True
         return False
 
+    def popup(self):
+        self.profiler.restart(self)
+        self.show_all()
+        self.present()
+
     def _quit(self):
+        # Hiding the menu mid-wait cancels the action
+        self._stop_closing()
+        if self.resident:
+            self.hide()
+            self.profiler.flush(resident=True)
+            return
+        self.profiler.flush()
         try:
             os.remove(PID_FILE)
         except FileNotFoundError:
@@ -106,6 +304,8 @@ class PowerMenu(Gtk.Window):
 
 
 def main():
+    profiler = Profiler("power", start=STARTED)
+    profiler.record("imports", STARTED, IMPORTED)
     if os.path.exists(PID_FILE):
         try:
             old_pid = int(open(PID_FILE).read().strip())
@@ -122,6 +322,7 @@ def main():
         f.write(str(os.getpid()))
 
     def on_sigterm(*args):
+        profiler.flush()
         try:
             os.remove(PID_FILE)
         except FileNotFoundError:
@@ -130,7 +331,7 @@ def main():
 
     signal.signal(signal.SIGTERM, on_sigterm)
 
-    win = PowerMenu()
+    win = PowerMenu(profiler)
     win.show_all()
     Gtk.main()
 
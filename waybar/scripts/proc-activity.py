@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Tech HUD — process activity indicator for waybar, read straight from /proc
+
+Watches processes whose command line matches a pattern (by default
+anything with "claude" in it) and shows whether any are running and
+whether they are busy. Busy means the CPU time used by the matching
+processes and all their descendants over the last interval, measured
+from /proc/<pid>/stat, is above a threshold.
+
+Runs for the life of the bar and prints a JSON line only when the state
+or process count changes:
+
+    "custom/activity": {
+        "exec": "~/.config/waybar/scripts/proc-activity.py",
+        "return-type": "json",
+        "restart-interval": 5
+    }
+
+Watch another tool with e.g. `--match 'cargo|rustc' --name Build`.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+INTERVAL = 2.0
+# Percent of one core across the process tree: above BUSY_CPU is busy,
+# and it stays busy until usage drops below CALM_CPU
+BUSY_CPU = 10.0
+CALM_CPU = 5.0
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def read_stat(pid):
+    """(ppid, utime + stime in clock ticks), or None if the pid is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses; fields resume after the last ")"
+    fields = data[data.rfind(b")") + 2 :].split()
+    return int(fields[1]), int(fields[11]) + int(fields[12])
+
+
+def read_cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode("utf-8", "replace").strip()
+    except OSError:
+        return ""
+
+
+def list_pids():
+    return frozenset(int(name) for name in os.listdir("/proc") if name.isdigit())
+
+
+def ancestors(pid):
+    """pid and its parents up to init (our own launcher shells match too)."""
+    chain = set()
+    while pid > 1 and pid not in chain:
+        chain.add(pid)
+        stat = read_stat(pid)
+        if stat is None:
+            break
+        pid = stat[0]
+    return chain
+
+
+class ProcessTree:
+    """Matching processes and their descendants, from a cached PID table.
+
+    Command lines and parents are read once per new PID: a tick where the
+    PID set is unchanged only reads /proc/<pid>/stat for the tree.
+    """
+
+    def __init__(self, pattern, exclude=()):
+        self.pattern = pattern
+        self.exclude = set(exclude)
+        self.pids = frozenset()
+        # pid -> (ppid, matches)
+        self.table = {}
+        self.matched = set()
+        self.tree = set()
+        self.ticks = {}
+        self.sampled = None
+
+    def rescan(self):
+        pids = list_pids()
+        if pids == self.pids:
+            return
+        for pid in self.pids - pids:
+            self.table.pop(pid, None)
+        for pid in pids - self.pids:
+            stat = read_stat(pid)
+            if stat is None:
+                continue
+            matches = pid not in self.exclude and bool(self.pattern.search(read_cmdline(pid)))
+            self.table[pid] = (stat[0], matches)
+        self.pids = pids
+        self.matched = {pid for pid, (_, matches) in self.table.items() if matches}
+
+        children = {}
+        for pid, (ppid, _) in self.table.items():
+            children.setdefault(ppid, []).append(pid)
+        tree, stack = set(), list(self.matched)
+        while stack:
+            pid = stack.pop()
+            if pid not in tree:
+                tree.add(pid)
+                stack.extend(children.get(pid, ()))
+        self.tree = tree
+
+    def cpu_percent(self):
+        """CPU use of the tree since the last call, in percent of one core."""
+        now = time.monotonic()
+        ticks = {}
+        for pid in self.tree:
+            stat = read_stat(pid)
+            if stat is not None:
+                ticks[pid] = stat[1]
+        # Processes new since the last sample count all their time
+        used = sum(t - self.ticks.get(pid, 0) for pid, t in ticks.items())
+        elapsed = now - self.sampled if self.sampled else None
+        self.ticks, self.sampled = ticks, now
+        if not elapsed:
+            return 0.0
+        return max(0.0, used / CLK_TCK / elapsed * 100)
+
+
+def badge(name, state, count):
+    plural = "process" if count == 1 else "processes"
+    if state == "thinking":
+        return {"text": "  ◆", "class": "thinking",
+                "tooltip": f"{name} is thinking... ({count} {plural})"}
+    if state == "active":
+        return {"text": "  ●", "class": "active",
+                "tooltip": f"{name} active ({count} {plural})"}
+    return {"text": " ○", "class": "idle", "tooltip": f"{name} idle"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process activity indicator for waybar")
+    parser.add_argument("--match", action="append",
+                        help="regex on the command line (repeatable; default: claude)")
+    parser.add_argument("--name", default="Claude", help="name shown in tooltips")
+    parser.add_argument("--interval", type=float, default=INTERVAL)
+    parser.add_argument("--busy-cpu", type=float, default=BUSY_CPU)
+    parser.add_argument("--calm-cpu", type=float, default=CALM_CPU)
+    args = parser.parse_args()
+
+    pattern = re.compile("|".join(f"(?:{m})" for m in args.match or ["claude"]))
+    tree = ProcessTree(pattern, exclude=ancestors(os.getpid()))
+    state, last = "idle", None
+    while True:
+        tree.rescan()
+        cpu = tree.cpu_percent()
+        if not tree.matched:
+            state = "idle"
+        elif cpu > args.busy_cpu or (state == "thinking" and cpu >= args.calm_cpu):
+            state = "thinking"
+        else:
+            state = "active"
+        line = json.dumps(badge(args.name, state, len(tree.matched)), ensure_ascii=False)
+        if line != last:
+            last = line
+            try:
+                print(line, flush=True)
+            except BrokenPipeError:
+                return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        pass